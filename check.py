@@ -3,17 +3,224 @@ Standalone script to validate a .biolib/config.yml file using the same validatio
 logic as in the BioLib CI/CD pipeline.
 """
 
-import argparse
+from __future__ import annotations
+
+import time
+
+# Recorded before anything else so --startup-report can break down the cold start
+_startup_cpu_time = time.process_time()
+_startup_time = time.perf_counter()
+
+import collections
 import os
+import re
 import sys
-import yaml
-from typing import Dict, Any, Optional
+
+# Annotations are not evaluated at runtime, so typing is only imported for type checkers
+# which saves several milliseconds of cold start
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Callable, Dict, Any, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+# Phases of the cold start as (name, seconds), see print_startup_report
+startup_timings = [('imports', time.perf_counter() - _startup_time)]
+
+def record_startup_phase(name: str, start: float) -> None:
+    """Record how long a phase of the startup took since start (a time.perf_counter value)."""
+    startup_timings.append((name, time.perf_counter() - start))
+
+_yaml = None
+
+def import_yaml():
+    """Import PyYAML on first use.
+
+    Importing yaml is the largest part of the checker's cold start, and paths such as cache
+    hits and --help never need it.
+    """
+    global _yaml
+    if _yaml is None:
+        start = time.perf_counter()
+        import yaml
+        _yaml = yaml
+        record_startup_phase('import yaml', start)
+    return _yaml
+
+_module_init_start = time.perf_counter()
 
 class ValidationError(Exception):
     def __init__(self, detail=None):
         self.detail = detail
         super().__init__(detail)
 
+class ValidationResult:
+    """Outcome of validating a single config file.
+
+    status is one of VALID, INVALID (detail holds the nested error dict rendered by
+    print_validation_errors, locations the flattened errors with positions) or ERROR (the file
+    could not be read or parsed, see message). version is the biolib_version when it could be
+    determined and duration the time spent validating in seconds. profile holds the timings
+    recorded while validating the file when profiling is enabled, see Profiler. upload holds the
+    number of files and bytes uploaded for the app when it was estimated, see UploadSetEstimator.
+    """
+    VALID = 'valid'
+    INVALID = 'invalid'
+    ERROR = 'error'
+
+    def __init__(
+            self,
+            config_file: str,
+            status: str,
+            detail: Any = None,
+            message: Optional[str] = None,
+            cached: bool = False,
+            locations: Optional[List[Dict[str, Any]]] = None,
+            version: Optional[int] = None,
+            duration: float = 0.0,
+            upload: Optional[Dict[str, int]] = None,
+    ):
+        self.config_file = config_file
+        self.status = status
+        self.detail = detail
+        self.message = message
+        self.cached = cached
+        self.locations = locations or []
+        self.version = version
+        self.duration = duration
+        self.upload = upload
+        self.profile = None
+
+    @property
+    def is_valid(self) -> bool:
+        return self.status == ValidationResult.VALID
+
+    def __repr__(self):
+        return f"ValidationResult({self.config_file!r}, {self.status!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON serializable representation of the result, with the error messages rendered.
+
+        Locations of error records keep their code next to the rendered message.
+        """
+        data = {
+            'config_file': self.config_file,
+            'status': self.status,
+            'detail': self.render_errors(self.detail),
+            'message': self.message,
+            'cached': self.cached,
+            'locations': self.render_locations(self.locations),
+            'version': self.version,
+            'duration': self.duration,
+        }
+        if self.upload is not None:
+            data['upload'] = self.upload
+        return data
+
+    @classmethod
+    def render_errors(cls, errors: Any) -> Any:
+        """Return errors with each ErrorRecord replaced by its message."""
+        if isinstance(errors, dict):
+            return {key: cls.render_errors(value) for key, value in errors.items()}
+        if isinstance(errors, list):
+            return [cls.render_errors(item) for item in errors]
+        if isinstance(errors, ErrorRecord):
+            return str(errors)
+        return errors
+
+    @staticmethod
+    def render_locations(locations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Return locations with each ErrorRecord message rendered and its code kept as "code"."""
+        return [
+            {**location, 'message': str(location['message']), 'code': location['message'].code}
+            if isinstance(location['message'], ErrorRecord)
+            else location
+            for location in locations
+        ]
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ValidationResult':
+        """Create a result from the representation returned by to_dict."""
+        return cls(
+            data['config_file'],
+            data['status'],
+            detail=data.get('detail'),
+            message=data.get('message'),
+            cached=data.get('cached', False),
+            locations=data.get('locations'),
+            version=data.get('version'),
+            duration=data.get('duration', 0.0),
+            upload=data.get('upload'),
+        )
+
+class LoaderLimits:
+    """Resource limits for parsing untrusted YAML, exceeding one is reported as a validation error.
+
+    max_alias_expansions counts the nodes added by resolving aliases, which bounds "billion
+    laughs" documents that are small to parse but huge once expanded.
+    """
+
+    def __init__(
+            self,
+            max_bytes: int = 10 * 1024 * 1024,
+            max_nodes: int = 1000000,
+            max_depth: int = 64,
+            max_alias_expansions: int = 100000,
+            max_scalar_length: int = 1024 * 1024,
+    ):
+        self.max_bytes = max_bytes
+        self.max_nodes = max_nodes
+        self.max_depth = max_depth
+        self.max_alias_expansions = max_alias_expansions
+        self.max_scalar_length = max_scalar_length
+
+    def __repr__(self):
+        return (
+            f"LoaderLimits(max_bytes={self.max_bytes}, max_nodes={self.max_nodes}, max_depth={self.max_depth}, "
+            f"max_alias_expansions={self.max_alias_expansions}, max_scalar_length={self.max_scalar_length})"
+        )
+
+class LoaderLimitError(Exception):
+    """Raised when a document exceeds one of the LoaderLimits, mark is where it was detected."""
+
+    def __init__(self, message: str, mark: Any = None):
+        self.message = message
+        self.mark = mark
+        super().__init__(message)
+
+class ValidationOptions:
+    """Settings that change how configs are validated.
+
+    max_errors stops validation once that many error messages were found (1 fails fast).
+    stream validates modules and arguments while the document is parsed, see StreamingValidator.
+    limits parses with the LoaderLimits enforced, which is slower than the default libyaml loader.
+    suggest appends "Did you mean" suggestions to errors about invalid field names and values.
+    check_files verifies that files referenced by configs on disk exist in their app directory,
+    see AppFileIndex. estimate_upload counts the files and bytes uploaded for configs on disk and
+    max_upload_bytes reports uploads larger than that as errors, see UploadSetEstimator. Results
+    with either of these depend on the directory contents and are not cached.
+    """
+
+    def __init__(
+            self,
+            max_errors: Optional[int] = None,
+            stream: bool = False,
+            limits: Optional[LoaderLimits] = None,
+            check_files: bool = False,
+            estimate_upload: bool = False,
+            max_upload_bytes: Optional[int] = None,
+            suggest: bool = False,
+    ):
+        self.max_errors = max_errors
+        self.stream = stream
+        self.limits = limits
+        self.check_files = check_files
+        self.estimate_upload = estimate_upload or max_upload_bytes is not None
+        self.max_upload_bytes = max_upload_bytes
+        self.suggest = suggest
+
+    def get_fingerprint(self) -> str:
+        """Return a string identifying the options, part of the result cache key."""
+        return repr(sorted(self.__dict__.items()))
+
 class ObjectDoesNotExist(Exception):
     pass
 
@@ -131,45 +338,377 @@ render_types = [
     ("toggle", "Toggle"),
 ]
 
-def validate_app_version(yaml_data: Dict[str, Any]) -> Dict[str, Any]:
+supported_root_level_fields = [
+    'arguments',
+    'biolib_version',
+    'citation',
+    'consumes_stdin',
+    'description_file',
+    'license_file',
+    'modules',
+    'output_type',
+    'remote_hosts',
+    'requires_user_identity',
+    'source_files_ignore',
+    'main_output_file',
+    'reserved_machines',
+    'app_data',
+    'auto_run_once_validation_passes',
+]
+
+supported_task_fields_base = [
+    'working_directory',
+]
+
+supported_task_fields_v1 = [
+    'executor',
+    'path'
+]
+
+supported_task_fields_v2 = [
+    'image',
+    'input_files',
+    'output_files',
+    'source_files',
+    'large_file_systems',
+    'data_records',
+    'command',
+    'gpu',
+    'secrets',
+    'default_machine',
+    'disable_default_machine_override',
+]
+
+supported_argument_fields = [
+    'default_value',
+    'description',
+    'do_not_pass_if_value_empty',
+    'exclude_value',
+    'key',
+    'key_value_separator',
+    'options',
+    'required',
+    'sub_arguments',
+    'type',
+    'group_arguments',
+    'group_separator',
+    'group_argument_separator',
+]
+
+# Lookup structures derived once from the rule tables above. The validators run per module,
+# argument and mapping, so membership tests use frozensets and regular expressions are compiled
+# up front. The lists are kept for the error messages, which must not change.
+supported_root_level_field_set = frozenset(supported_root_level_fields)
+
+supported_task_field_sets = {
+    1: frozenset(supported_task_fields_base + supported_task_fields_v1),
+    2: frozenset(supported_task_fields_base + supported_task_fields_v2),
+}
+
+supported_argument_field_set = frozenset(supported_argument_fields)
+
+stdout_render_types_choices = [type_tuple[0] for type_tuple in stdout_render_types]
+stdout_render_types_choice_set = frozenset(stdout_render_types_choices)
+
+render_types_choices = [type_tuple[0] for type_tuple in render_types]
+render_types_choice_set = frozenset(render_types_choices)
+
+allowed_yaml_environments = AllowedYAMLEnvironments.values()
+allowed_yaml_environment_set = frozenset(allowed_yaml_environments)
+
+module_gpu_preferences = ModuleGpuPreference.values()
+module_gpu_preference_set = frozenset(module_gpu_preferences)
+
+custom_executor_supported_versions = {
+    executor: executor_data['versions'] + ['*'] for executor, executor_data in custom_executors.items()
+}
+custom_executor_supported_version_sets = {
+    executor: frozenset(versions) for executor, versions in custom_executor_supported_versions.items()
+}
+biolib_executor_image_names = ["biolib/" + executor for executor in custom_executors.keys()]
+
+module_name_pattern = re.compile("^[A-Za-z0-9_-]+$")
+module_name_consecutive_separators_pattern = re.compile("(--)|(__)|(-_)|(_-)")
+module_name_leading_separator_pattern = re.compile("^(-|_)[A-Za-z0-9_-]+$")
+module_name_trailing_separator_pattern = re.compile("^[A-Za-z0-9_-]+(-|_)$")
+# Splits "COPY from_path to_path" in one match, the parts may be empty like with split(' ')
+mapping_pattern = re.compile("([^ ]*) ([^ ]*) ([^ ]*)")
+# A "$" that does not start an argument number like "$1"
+mapping_invalid_variable_pattern = re.compile(r"\$(?![1-9])")
+mapping_trailing_variable_pattern = re.compile(r"\$[0-9]*$")
+
+record_startup_phase('rule tables', _module_init_start)
+
+def is_valid_choice(value: Any, choices: frozenset) -> bool:
+    """Check membership of a value read from the YAML in a set of choices."""
+    try:
+        return value in choices
+    except TypeError:
+        # Unhashable values such as lists and dicts are never valid choices
+        return False
+
+class ErrorBudget:
+    """Tracks the number of error messages found against an optional maximum."""
+
+    def __init__(self, max_errors: Optional[int] = None):
+        self.max_errors = max_errors
+        self.count = 0
+
+    def add(self, errors: Any) -> None:
+        self.count += count_errors(errors)
+
+    def is_exhausted(self, pending_errors: Any = None) -> bool:
+        """Check whether the budget is used up, counting pending_errors not yet added."""
+        if self.max_errors is None:
+            return False
+        return self.count + (count_errors(pending_errors) if pending_errors else 0) >= self.max_errors
+
+# Message of each error code, rendered with the params of an ErrorRecord in the order their
+# fields first appear. Codes are stable, so errors can be filtered and aggregated by code
+# without rendering their messages.
+error_message_templates = {
+    'root.unsupported_field': 'The field {field} is not valid',
+    'biolib_version.missing': 'Your config file is missing the biolib_version field.',
+    'biolib_version.unsupported': 'BioLib version must be 2. Please update ".biolib/config.yml" to "biolib_version: 2"',
+    'reserved_machines.invalid': 'reserved_machines must be a positive integer',
+    'reserved_machines.too_many': 'reserved_machines must be less than {maximum}',
+    'output_type.conflict': 'output_type and main_output_file can not be specified at the same time',
+    'output_type.invalid': 'Invalid output_type specified for your app. output_type can be one of {choices}',
+    'main_output_file.not_string': (
+        'Invalid main_output_file specified for your app. main_output_file must be a string'
+    ),
+    'main_output_file.not_absolute': 'Path to main_output_file must be absolute (start with "/")',
+    'consumes_stdin.not_boolean': 'Invalid consumes_stdin specified for your app. consumes_stdin can be true or false',
+    'requires_user_identity.not_boolean': (
+        'Invalid requires_user_identity specified for your app. requires_user_identity can be true or false'
+    ),
+    'remote_hosts.not_list': 'Invalid remote_hosts specified for your app. remote_hosts must be a list of hostnames',
+    'remote_hosts.invalid_hostname': 'Invalid hostname in remote_hosts. All hostnames must be strings',
+    'citation.not_dict': 'Invalid citation specified for your app. citation must be a dictionary',
+    'citation.missing_entry_type': 'Missing entry_type in citation. entry_type is required',
+    'citation.year_not_string': 'Year in citation must be a string',
+    'description_file.not_string': (
+        'Invalid description_file specified for your app. description_file must be a string'
+    ),
+    'license_file.not_string': 'Invalid license_file specified for your app. license_file must be a string',
+    'file.missing': (
+        'The {field} {file_path} does not exist in the app directory {root}. Please add the file or correct the path.'
+    ),
+    'source_files_ignore.invalid': (
+        'Invalid source_files_ignore specified for your app. source_files_ignore must be a list of glob patterns'
+    ),
+    'source_files_ignore.too_large': (
+        'The app directory {root} uploads {file_count} files of {size}, more than the limit of {max_size}. '
+        'Please add the files your app does not need to source_files_ignore.'
+    ),
+    'module.invalid_name': 'The module name {name} is invalid, it can only contain alphanumeric characters.',
+    'module.consecutive_separators': (
+        'The module name {name} is invalid, it can not contain consecutive dashes or underscores'
+    ),
+    'module.leading_separator': 'The module name {name} is invalid, it can not start with dashes or underscores',
+    'module.trailing_separator': 'The module name {name} is invalid, it can not end with dashes or underscores',
+    'module.wrong_type': 'Module {name} is the wrong type. Modules can only be a YAML dict in version {version}',
+    'module.deprecated_field': 'The field "{field}" has been deprecated please use "default_machine" instead',
+    'module.unsupported_field': 'The field "{field}" on module "{name}" is invalid for "biolib_version: {version}"',
+    'working_directory.not_absolute': (
+        'Wrong path format on working_directory for {name}. Directory path must be an absolute path'
+    ),
+    'working_directory.no_trailing_slash': (
+        'Wrong path format on working_directory for {name}. Directories must end in a slash: "/dir/sub_dir/"'
+    ),
+    'working_directory.consecutive_slashes': (
+        'Wrong path format on working_directory for {name}. Directories can not have consecutive slashes"'
+    ),
+    'executor.missing': (
+        'You must define an executor in your module definition; Make sure you follow the format executor_name:version'
+    ),
+    'executor.invalid_format': (
+        'Executor {executor} on module {name} is invalid. Please only use ":" to separate to and from paths i.e. '
+        '"from:to".'
+    ),
+    'executor.invalid': (
+        'You provided an invalid executor in module {name}; Make sure you follow the format executor_name:version'
+    ),
+    'executor.invalid_version': (
+        'Invalid version for executor {executor} on module {name}. The supported versions for {executor} are '
+        '{versions}'
+    ),
+    'mapping.missing': '{mapping_type} field on module {name} is required. Please specify your {mapping_type}.',
+    'mapping.not_list': '{mapping_type} field on module {name} is invalid. Please format the field as a yaml array.',
+    'mapping.invalid_format': (
+        '{mapping_type} item {mapping} on module {name} is invalid. Please use the format "COPY from_path to_path" '
+        'i.e. "COPY / /home/biolib/"'
+    ),
+    'mapping.missing_copy': (
+        '{mapping_type} item {mapping} on module {name} is missing the COPY command. Please use the format '
+        '"COPY from_path to_path" i.e. "COPY / /home/biolib/"'
+    ),
+    'mapping.invalid_variable': (
+        '{mapping_type} item {mapping} on module {name} in path "{mapping_path}" is using an invalid variable. '
+        'Please only use variables referring to an argument number, where "$1" refers to the first argument '
+        'i.e. "COPY $1 /home/biolib/$1"'
+    ),
+    'mapping.directory_to_file': (
+        '{mapping_type} item {mapping} on module {name} is invalid. Directories can only map to other directories'
+    ),
+    'mapping.relative_path': (
+        '{mapping_type} item {mapping} on module {name} on path "{mapping_path}" is invalid. Only absolute paths allowed'
+    ),
+    'mapping.consecutive_slashes': (
+        '{mapping_type} item {mapping} on module {name} is invalid. Directories can not have consecutive slashes'
+    ),
+    'mapping.same_destination': (
+        '{mapping_type} item {mapping} on module {name} has the same to_path as {conflicting_mapping_type} item '
+        '{conflicting_mapping}. Please copy each file to a different path'
+    ),
+    'mapping.file_directory_conflict': (
+        '{mapping_type} item {mapping} on module {name} conflicts with {conflicting_mapping_type} item '
+        '{conflicting_mapping}. The path "{conflicting_path}" can not be both a file and a directory'
+    ),
+    'mapping.missing_source': (
+        'source_files item {mapping} on module {name} copies "{from_path}" which does not exist in the '
+        'app directory {root}'
+    ),
+    'image.missing': 'You must define an image to use for module {name}.',
+    'image.invalid_format': (
+        'Wrong image format on module {name}. You must define an image using the following format '
+        '"environment://image_name:version"'
+    ),
+    'image.invalid_environment': (
+        'Wrong environment on image of module {name}. The environment should be specified before "://" and can be '
+        'only be one of {environments}'
+    ),
+    'image.missing_version': (
+        'Missing version on the image of module {name}. A version must be specified at the end of the image like '
+        'so: "environment://image_name:version"'
+    ),
+    'image.invalid_executor': (
+        'Invalid image name biolib/{executor} for biolib executor on module {name}. The supported biolib executors '
+        'are {executors}'
+    ),
+    'image.invalid_version': (
+        'Invalid version for biolib executor {executor} on module {name}. The supported versions for {executor} are '
+        '{versions}'
+    ),
+    'gpu.invalid': 'Invalid value for "gpu". You can specify one of {choices}',
+    'default_machine.invalid': 'Invalid machine type',
+    'default_machine.gpu_conflict': 'Cannot be specified with the "gpu" option',
+    'disable_default_machine_override.not_boolean': 'Must be boolean',
+    'argument.missing_key': (
+        'One of your arguments is missing a key. Please specify a key for each of your arguments'
+    ),
+    'argument.unsupported_field': 'The argument field {field} on {key} is not valid',
+    'argument.sub_and_group_arguments': 'Only one of `sub_arguments` or `group_arguments` can be specified',
+    'argument.missing_description': (
+        'Could not find a description for argument {key}. Please provide a description for {key}'
+    ),
+    'required.not_boolean': 'Invalid value in required specified on {key} argument. required can be true or false',
+    'type.invalid': 'Invalid value {type} in type specified on {key} argument type can be one of {choices}',
+    'type.toggle_missing_options': 'There must be exactly 2 options ("on" and "off") on arguments of type toggle',
+    'type.toggle_option_count': (
+        'There must be exactly 2 options ("on" and "off") on arguments of type toggle. Received {count} options'
+    ),
+    'type.toggle_option_names': (
+        'The two options on arguments of type toggle must be named "on" and "off". Received {options}'
+    ),
+}
+
+# Templates with their fields replaced by the index of their param, filled when first rendered
+error_message_positional_templates = {}
+
+class ErrorRecord:
+    """An error found by a validation rule, rendered to its message only when it is reported.
+
+    code is a key of error_message_templates and path the document path the error is about,
+    with modules by name and arguments by key. Rules that only see a module give the path
+    within it. params are the values of the template fields in the order they first appear,
+    followed by values only kept for add_suggestions. str() and repr() render the message, so
+    records print, also within the error dicts, and serialize (with json's default=str)
+    exactly like the message strings they stand for.
+    """
+    __slots__ = ('code', 'path', 'params')
+
+    def __init__(self, code: str, path: Tuple, *params: Any):
+        self.code = code
+        self.path = path
+        self.params = params
+
+    @property
+    def message(self) -> str:
+        if not self.params:
+            return error_message_templates[self.code]
+        template = error_message_positional_templates.get(self.code)
+        if template is None:
+            template = error_message_positional_templates[self.code] = get_positional_template(
+                error_message_templates[self.code]
+            )
+        return template.format(*self.params)
+
+    def __str__(self):
+        return self.message
+
+    def __repr__(self):
+        return repr(self.message)
+
+class SuggestedErrorRecord(ErrorRecord):
+    """An ErrorRecord whose message ends with "Did you mean" suggestions of valid values."""
+    __slots__ = ('suggestions',)
+
+    def __init__(self, record: ErrorRecord, suggestions: List[str]):
+        super().__init__(record.code, record.path, *record.params)
+        self.suggestions = suggestions
+
+    @property
+    def message(self) -> str:
+        message = super().message
+        separator = ' ' if message.endswith('.') else '. '
+        return f"{message}{separator}Did you mean {' or '.join(repr(suggestion) for suggestion in self.suggestions)}?"
+
+def get_positional_template(template: str) -> str:
+    """Replace the named fields of a template by their index in the order they first appear."""
+    import string
+
+    fields = {}
+    parts = []
+    for literal, field, format_spec, conversion in string.Formatter().parse(template):
+        parts.append(literal.replace('{', '{{').replace('}', '}}'))
+        if field is not None:
+            index = fields.setdefault(field, len(fields))
+            parts.append('{' + str(index) + (f'!{conversion}' if conversion else '') + (f':{format_spec}' if format_spec else '') + '}')
+    return ''.join(parts)
+
+def count_errors(errors: Any) -> int:
+    """Count the error messages in a (nested) error dict or list."""
+    if isinstance(errors, dict):
+        return sum(count_errors(field_errors) for field_errors in errors.values())
+    if isinstance(errors, list):
+        return sum(count_errors(error) for error in errors)
+    return 1
+
+def validate_app_version(
+        yaml_data: Dict[str, Any],
+        budget: Optional[ErrorBudget] = None,
+        file_index: Optional[AppFileIndex] = None,
+        upload_estimator: Optional[UploadSetEstimator] = None,
+) -> Dict[str, Any]:
     """Validate app version configuration."""
     error_dict = {}
-    validate_unsupported_root_level_fields(yaml_data, error_dict)
-    validate_reserved_machines(yaml_data, error_dict)
-    validate_output_type(yaml_data, error_dict)
-    validate_main_output_file_path(yaml_data, error_dict)
-    validate_consumes_stdin(yaml_data, error_dict)
-    validate_requires_user_identity(yaml_data, error_dict)
-    validate_remote_hosts(yaml_data, error_dict)
-    validate_citation(yaml_data, error_dict)
-    validate_description_file(yaml_data, error_dict)
-    validate_license_file(yaml_data, error_dict)
+    for validate_field in app_version_field_validators:
+        validate_field(yaml_data, error_dict)
+        if budget is not None and budget.is_exhausted(error_dict):
+            return error_dict
+    if file_index is not None:
+        validate_referenced_files(yaml_data, error_dict, file_index)
+    if upload_estimator is not None:
+        upload_estimator.validate(yaml_data, error_dict)
     return error_dict
 
 def validate_unsupported_root_level_fields(yaml_data: Dict[str, Any], error_dict: Dict[str, Any]) -> None:
     """Validate that only supported root level fields are present."""
-    supported_fields = [
-        'arguments',
-        'biolib_version',
-        'citation',
-        'consumes_stdin',
-        'description_file',
-        'license_file',
-        'modules',
-        'output_type',
-        'remote_hosts',
-        'requires_user_identity',
-        'source_files_ignore',
-        'main_output_file',
-        'reserved_machines',
-        'app_data',
-        'auto_run_once_validation_passes',
-    ]
-
     errors = []
     for field in yaml_data.keys():
-        if field not in supported_fields:
-            errors.append(f'The field {field} is not valid')
+        if field not in supported_root_level_field_set:
+            errors.append(ErrorRecord('root.unsupported_field', (field,), field))
 
     if errors:
         error_dict['unsupported_fields'] = errors
@@ -181,55 +720,49 @@ def validate_reserved_machines(yaml_data: Dict[str, Any], error_dict: Dict[str,
     if 'reserved_machines' in yaml_data.keys():
         reserved_machines = yaml_data['reserved_machines']
         if not isinstance(reserved_machines, int) or reserved_machines < 1:
-            error_dict['reserved_machines'] = ['reserved_machines must be a positive integer']
+            error_dict['reserved_machines'] = [ErrorRecord('reserved_machines.invalid', ('reserved_machines',))]
         elif reserved_machines > reserved_machines_max:
-            error_dict['reserved_machines'] = [f'reserved_machines must be less than {reserved_machines_max}']
+            error_dict['reserved_machines'] = [
+                ErrorRecord('reserved_machines.too_many', ('reserved_machines',), reserved_machines_max)
+            ]
 
 def validate_output_type(yaml_data: Dict[str, Any], error_dict: Dict[str, Any]) -> None:
     """Validate output_type field."""
     if 'output_type' in yaml_data.keys():
         if 'main_output_file' in yaml_data.keys():
-            error_dict['output_type'] = [
-                f'output_type and main_output_file can not be specified at the same time'
-            ]
+            error_dict['output_type'] = [ErrorRecord('output_type.conflict', ('output_type',))]
             return
         output_type = yaml_data['output_type']
-        stdout_render_types_choices = [type_tuple[0] for type_tuple in stdout_render_types]
-        if output_type not in stdout_render_types_choices:
-            error_dict['output_type'] = [
-                f'Invalid output_type specified for your app. output_type can be one of {stdout_render_types_choices}'
-            ]
+        if not is_valid_choice(output_type, stdout_render_types_choice_set):
+            error_dict['output_type'] = [ErrorRecord(
+                'output_type.invalid', ('output_type',),
+                stdout_render_types_choices, output_type,
+            )]
 
 def validate_main_output_file_path(yaml_data: Dict[str, Any], error_dict: Dict[str, Any]) -> None:
     """Validate main_output_file field."""
     if 'main_output_file' in yaml_data.keys():
         main_output_file = yaml_data['main_output_file']
         if not isinstance(main_output_file, str):
-            error_dict['main_output_file'] = [
-                f'Invalid main_output_file specified for your app. main_output_file must be a string'
-            ]
+            error_dict['main_output_file'] = [ErrorRecord('main_output_file.not_string', ('main_output_file',))]
             return
 
         if not main_output_file.startswith('/'):
-            error_dict['main_output_file'] = [
-                f'Path to main_output_file must be absolute (start with "/")'
-            ]
+            error_dict['main_output_file'] = [ErrorRecord('main_output_file.not_absolute', ('main_output_file',))]
 
 def validate_consumes_stdin(yaml_data: Dict[str, Any], error_dict: Dict[str, Any]) -> None:
     """Validate consumes_stdin field."""
     if 'consumes_stdin' in yaml_data.keys():
         consumes_stdin = yaml_data['consumes_stdin']
         if not isinstance(consumes_stdin, bool):
-            error_dict['consumes_stdin'] = [
-                f'Invalid consumes_stdin specified for your app. consumes_stdin can be true or false'
-            ]
+            error_dict['consumes_stdin'] = [ErrorRecord('consumes_stdin.not_boolean', ('consumes_stdin',))]
 
 def validate_requires_user_identity(yaml_data: Dict[str, Any], error_dict: Dict[str, Any]) -> None:
     """Validate requires_user_identity field."""
     if 'requires_user_identity' in yaml_data.keys():
         if not isinstance(yaml_data['requires_user_identity'], bool):
             error_dict['requires_user_identity'] = [
-                f'Invalid requires_user_identity specified for your app. requires_user_identity can be true or false'
+                ErrorRecord('requires_user_identity.not_boolean', ('requires_user_identity',))
             ]
 
 def validate_remote_hosts(yaml_data: Dict[str, Any], error_dict: Dict[str, Any]) -> None:
@@ -237,16 +770,12 @@ def validate_remote_hosts(yaml_data: Dict[str, Any], error_dict: Dict[str, Any])
     if 'remote_hosts' in yaml_data.keys():
         remote_hosts = yaml_data['remote_hosts']
         if not isinstance(remote_hosts, list):
-            error_dict['remote_hosts'] = [
-                f'Invalid remote_hosts specified for your app. remote_hosts must be a list of hostnames'
-            ]
+            error_dict['remote_hosts'] = [ErrorRecord('remote_hosts.not_list', ('remote_hosts',))]
             return
         
         for host in remote_hosts:
             if not isinstance(host, str):
-                error_dict['remote_hosts'] = [
-                    f'Invalid hostname in remote_hosts. All hostnames must be strings'
-                ]
+                error_dict['remote_hosts'] = [ErrorRecord('remote_hosts.invalid_hostname', ('remote_hosts',))]
                 return
 
 def validate_citation(yaml_data: Dict[str, Any], error_dict: Dict[str, Any]) -> None:
@@ -254,63 +783,86 @@ def validate_citation(yaml_data: Dict[str, Any], error_dict: Dict[str, Any]) ->
     if 'citation' in yaml_data.keys():
         citation = yaml_data['citation']
         if not isinstance(citation, dict):
-            error_dict['citation'] = [
-                f'Invalid citation specified for your app. citation must be a dictionary'
-            ]
+            error_dict['citation'] = [ErrorRecord('citation.not_dict', ('citation',))]
             return
         
         if 'entry_type' not in citation:
-            error_dict['citation'] = [
-                f'Missing entry_type in citation. entry_type is required'
-            ]
+            error_dict['citation'] = [ErrorRecord('citation.missing_entry_type', ('citation',))]
             return
         
         required_fields = ['entry_type']
         
         if 'year' in citation and not isinstance(citation['year'], str):
-            error_dict['citation'] = [
-                f'Year in citation must be a string'
-            ]
+            error_dict['citation'] = [ErrorRecord('citation.year_not_string', ('citation', 'year'))]
 
 def validate_description_file(yaml_data: Dict[str, Any], error_dict: Dict[str, Any]) -> None:
     """Validate description_file field."""
     if 'description_file' in yaml_data.keys():
         description_file = yaml_data['description_file']
         if not isinstance(description_file, str):
-            error_dict['description_file'] = [
-                f'Invalid description_file specified for your app. description_file must be a string'
-            ]
+            error_dict['description_file'] = [ErrorRecord('description_file.not_string', ('description_file',))]
 
 def validate_license_file(yaml_data: Dict[str, Any], error_dict: Dict[str, Any]) -> None:
     """Validate license_file field."""
     if 'license_file' in yaml_data.keys():
         license_file = yaml_data['license_file']
         if not isinstance(license_file, str):
-            error_dict['license_file'] = [
-                f'Invalid license_file specified for your app. license_file must be a string'
-            ]
+            error_dict['license_file'] = [ErrorRecord('license_file.not_string', ('license_file',))]
+
+def validate_referenced_files(yaml_data: Dict[str, Any], error_dict: Dict[str, Any], file_index: AppFileIndex) -> None:
+    """Validate that the description_file and license_file exist in the app directory."""
+    for field in ('description_file', 'license_file'):
+        path = yaml_data.get(field)
+        if isinstance(path, str) and field not in error_dict and not file_index.is_file(path):
+            error_dict[field] = [ErrorRecord('file.missing', (field,), field, path, file_index.root)]
+
+# Root level checks in the order they run, all of them are cheap lookups on the root dict
+app_version_field_validators = [
+    validate_unsupported_root_level_fields,
+    validate_reserved_machines,
+    validate_output_type,
+    validate_main_output_file_path,
+    validate_consumes_stdin,
+    validate_requires_user_identity,
+    validate_remote_hosts,
+    validate_citation,
+    validate_description_file,
+    validate_license_file,
+]
 
 def validate_and_get_biolib_yaml_version(yaml_data: Dict[str, Any]) -> int:
     """Validate biolib_version field and return its value."""
     if 'biolib_version' not in yaml_data.keys():
-        raise ValidationError({'config_yml': ['Your config file is missing the biolib_version field.']})
+        raise ValidationError({'config_yml': [ErrorRecord('biolib_version.missing', ())]})
     else:
         biolib_version = yaml_data['biolib_version']
 
     if biolib_version != 2:
-        raise ValidationError({'config_yml': [
-            'BioLib version must be 2. Please update ".biolib/config.yml" to "biolib_version: 2"'
-        ]})
+        raise ValidationError({'config_yml': [ErrorRecord('biolib_version.unsupported', ('biolib_version',))]})
 
     return biolib_version
 
-def validate_task(name: str, task_data: Any, yaml_version: int) -> Dict[str, Any]:
+def validate_task(
+        name: str,
+        task_data: Any,
+        yaml_version: int,
+        file_index: Optional[AppFileIndex] = None,
+) -> Dict[str, Any]:
     """Validate a task configuration."""
     error_dict = {}
     name = validate_name(name, error_dict)
     if not name:
         return error_dict
-    
+    return validate_task_fields(name, task_data, yaml_version, file_index)
+
+def validate_task_fields(
+        name: str,
+        task_data: Any,
+        yaml_version: int,
+        file_index: Optional[AppFileIndex] = None,
+) -> Dict[str, Any]:
+    """Validate the fields of a task whose name is valid, the name is only used in the errors."""
+    error_dict = {}
     error_dict[name] = {}
     task_error_dict = error_dict[name]
     
@@ -322,13 +874,21 @@ def validate_task(name: str, task_data: Any, yaml_version: int) -> Dict[str, Any
             validate_executor(name, task_data, task_error_dict)
     else:
         validate_unsupported_task_fields(name, task_data, task_error_dict, yaml_version)
-        validate_mappings(name, task_data, task_error_dict, mapping_type='input_files')
+        # input_files and source_files both copy into the container, output_files copy out of it
+        container_destinations = MappingDestinationIndex()
+        validate_mappings(
+            name, task_data, task_error_dict, mapping_type='input_files', destinations=container_destinations
+        )
         validate_mappings(name, task_data, task_error_dict, mapping_type='output_files')
-        validate_mappings(name, task_data, task_error_dict, mapping_type='source_files')
+        validate_mappings(
+            name, task_data, task_error_dict, mapping_type='source_files', destinations=container_destinations
+        )
+        if file_index is not None:
+            validate_source_file_paths(name, task_data, task_error_dict, file_index)
         validate_image(name, task_data, task_error_dict, yaml_version)
-        validate_gpu(task_data, task_error_dict)
-        validate_default_machine(task_data, task_error_dict)
-        validate_disable_default_machine_override(task_data, task_error_dict)
+        validate_gpu(name, task_data, task_error_dict)
+        validate_default_machine(name, task_data, task_error_dict)
+        validate_disable_default_machine_override(name, task_data, task_error_dict)
 
     validate_working_directory(name, task_data, task_error_dict)
 
@@ -339,22 +899,20 @@ def validate_task(name: str, task_data: Any, yaml_version: int) -> Dict[str, Any
 
 def validate_name(name: str, error_dict: Dict[str, Any]) -> Optional[str]:
     """Validate a task name."""
-    import re
-    
-    if not re.match("^[A-Za-z0-9_-]+$", name):
-        error_dict[name] = [f'The module name {name} is invalid, it can only contain alphanumeric characters.']
+    if not module_name_pattern.match(name):
+        error_dict[name] = [ErrorRecord('module.invalid_name', ('modules', name), name)]
         return None
 
-    if re.search("(--)|(__)|(-_)|(_-)", name):
-        error_dict[name] = [f'The module name {name} is invalid, it can not contain consecutive dashes or underscores']
+    if module_name_consecutive_separators_pattern.search(name):
+        error_dict[name] = [ErrorRecord('module.consecutive_separators', ('modules', name), name)]
         return None
 
-    if re.match("^(-|_)[A-Za-z0-9_-]+$", name):
-        error_dict[name] = [f'The module name {name} is invalid, it can not start with dashes or underscores']
+    if module_name_leading_separator_pattern.match(name):
+        error_dict[name] = [ErrorRecord('module.leading_separator', ('modules', name), name)]
         return None
 
-    if re.match("^[A-Za-z0-9_-]+(-|_)$", name):
-        error_dict[name] = [f'The module name {name} is invalid, it can not end with dashes or underscores']
+    if module_name_trailing_separator_pattern.match(name):
+        error_dict[name] = [ErrorRecord('module.trailing_separator', ('modules', name), name)]
         return None
 
     return name
@@ -364,474 +922,3739 @@ def validate_working_directory(name: str, task_data: Dict[str, Any], error_dict:
     if 'working_directory' in task_data:
         if not task_data['working_directory'].startswith('/'):
             error_dict['working_directory'] = [
-                f'Wrong path format on working_directory for {name}. Directory path must be an absolute path'
+                ErrorRecord('working_directory.not_absolute', ('modules', name, 'working_directory'), name)
             ]
             return
 
         if not task_data['working_directory'].endswith('/'):
             error_dict['working_directory'] = [
-                f'Wrong path format on working_directory for {name}. Directories must end in a slash: "/dir/sub_dir/"'
+                ErrorRecord('working_directory.no_trailing_slash', ('modules', name, 'working_directory'), name)
             ]
             return
 
         if '//' in task_data['working_directory']:
             error_dict['working_directory'] = [
-                f'Wrong path format on working_directory for {name}. Directories can not have consecutive slashes"'
+                ErrorRecord('working_directory.consecutive_slashes', ('modules', name, 'working_directory'), name)
             ]
 
 def validate_executor(name: str, task_data: Dict[str, Any], error_dict: Dict[str, Any]) -> None:
     """Validate executor field."""
     if 'executor' not in task_data.keys():
-        error_dict['executor'] = [
-            'You must define an executor in your module definition; '
-            'Make sure you follow the format executor_name:version'
-        ]
+        error_dict['executor'] = [ErrorRecord('executor.missing', ('modules', name))]
         return
 
     if task_data['executor'].count(':') != 1:
-        error_dict['executor'] = [
-            f'Executor {task_data["executor"]} on module {name} is invalid. Please only use ":" to separate to and from paths i.e. "from:to".'
-        ]
+        error_dict['executor'] = [ErrorRecord(
+            'executor.invalid_format', ('modules', name, 'executor'),
+            task_data['executor'], name,
+        )]
         return
 
     executor, version = task_data['executor'].split(':')
     if executor not in old_to_new_executors_map.keys():
-        error_dict['executor'] = [
-            f'You provided an invalid executor in module {name}; '
-            'Make sure you follow the format executor_name:version'
-        ]
+        error_dict['executor'] = [ErrorRecord('executor.invalid', ('modules', name, 'executor'), name)]
 
     new_executor_name = old_to_new_executors_map[executor]
-    supported_versions = custom_executors[new_executor_name]['versions'] + ['*']
-    if version not in supported_versions:
-        error_dict['image'] = [
-            f'Invalid version for executor {executor} on module {name}. The supported versions for {executor} are {supported_versions}'
-        ]
+    supported_versions = custom_executor_supported_versions[new_executor_name]
+    if version not in custom_executor_supported_version_sets[new_executor_name]:
+        error_dict['image'] = [ErrorRecord(
+            'executor.invalid_version', ('modules', name, 'executor'),
+            executor, name, supported_versions,
+        )]
         return
 
-def validate_mappings(name: str, task_data: Dict[str, Any], error_dict: Dict[str, Any], mapping_type: str) -> None:
-    """Validate file mappings."""
-    import re
-    
+def validate_mappings(
+        name: str,
+        task_data: Dict[str, Any],
+        error_dict: Dict[str, Any],
+        mapping_type: str,
+        destinations: Optional[MappingDestinationIndex] = None,
+) -> None:
+    """Validate file mappings.
+
+    destinations holds the to_path of the mappings checked before that copy into the same
+    container, by default only the mappings of mapping_type are checked against each other.
+    """
     if mapping_type not in task_data:
         if not mapping_type == "source_files" and not task_data.get('image', '').startswith(f'{AllowedYAMLEnvironments.APP_DATA}://'):
             error_dict[mapping_type] = [
-                f'{mapping_type} field on module {name} is required. Please specify your {mapping_type}.'
+                ErrorRecord('mapping.missing', ('modules', name), mapping_type, name)
             ]
         return
 
     if not isinstance(task_data[mapping_type], list):
         error_dict[mapping_type] = [
-            f'{mapping_type} field on module {name} is invalid. Please format the field as a yaml array.'
+            ErrorRecord('mapping.not_list', ('modules', name, mapping_type), mapping_type, name)
         ]
         return
 
-    for mapping in task_data.get(mapping_type):
-        mapping_parts = mapping.split(' ')
-        if len(mapping_parts) != 3:
-            error_dict[mapping_type] = [
-                f'{mapping_type} item {mapping} on module {name} is invalid. Please use the format "COPY from_path to_path" i.e. "COPY / /home/biolib/"'
-            ]
-            return
+    mapping_errors = []
+    if destinations is None:
+        destinations = MappingDestinationIndex()
+    for index, mapping in enumerate(task_data[mapping_type]):
+        mapping_error = get_mapping_error(name, mapping, mapping_type, index)
+        if mapping_error:
+            mapping_errors.append(mapping_error)
+            continue
 
-        if mapping_parts[0] != 'COPY':
-            error_dict[mapping_type] = [
-                f'{mapping_type} item {mapping} on module {name} is missing the COPY command. Please use the format "COPY from_path to_path" i.e. "COPY / /home/biolib/"'
-            ]
-            return
+        conflict, conflicting_path = destinations.add(mapping.split(' ', 2)[2], (mapping_type, mapping))
+        if conflict is None:
+            continue
+        conflicting_mapping_type, conflicting_mapping = conflict
+        if conflicting_path is None:
+            mapping_errors.append(ErrorRecord(
+                'mapping.same_destination', ('modules', name, mapping_type, index),
+                mapping_type, mapping, name, conflicting_mapping_type, conflicting_mapping,
+            ))
+        else:
+            mapping_errors.append(ErrorRecord(
+                'mapping.file_directory_conflict', ('modules', name, mapping_type, index),
+                mapping_type, mapping, name, conflicting_mapping_type, conflicting_mapping, conflicting_path,
+            ))
 
-        from_path = mapping_parts[1]
-        to_path = mapping_parts[2]
+    if mapping_errors:
+        error_dict[mapping_type] = mapping_errors
 
-        if '$' in re.sub(r"\$[1-9][0-9]*", "", from_path):
-            error_dict[mapping_type] = [
-                f'{mapping_type} item {mapping} on module {name} in path "{from_path}" is using an invalid variable. '
-                'Please only use variables referring to an argument number, where "$1" refers to the first argument '
-                'i.e. "COPY $1 /home/biolib/$1"'
-            ]
-            return
+def get_mapping_error(name: str, mapping: Any, mapping_type: str, index: int) -> Optional[ErrorRecord]:
+    """Return the first problem with a "COPY from_path to_path" file mapping, or None if it is valid.
 
-        if '$' in re.sub(r"\$[1-9][0-9]*", "", to_path):
-            error_dict[mapping_type] = [
-                f'{mapping_type} item {mapping} on module {name} in path "{to_path}" is using an invalid variable. '
-                'Please only use variables referring to an argument number, where "$1" refers to the first argument '
-                'i.e. "COPY $1 /home/biolib/$1"'
-            ]
-            return
+    index is the position of the mapping in its list, part of the path of the error.
+    """
+    path = ('modules', name, mapping_type, index)
+    match = mapping_pattern.fullmatch(mapping) if isinstance(mapping, str) else None
+    if match is None:
+        return ErrorRecord('mapping.invalid_format', path, mapping_type, mapping, name)
 
-        to_path_with_vars_replaced_with_dollar = re.sub("\$[0-9]+", "$", to_path)
-        if from_path.endswith('/') and (not to_path.endswith('/') and
-                                        not to_path_with_vars_replaced_with_dollar.endswith('$')):
-            error_dict[mapping_type] = [
-                f'{mapping_type} item {mapping} on module {name} is invalid. Directories can only map to other directories'
-            ]
-            return
+    command, from_path, to_path = match.groups()
+    if command != 'COPY':
+        return ErrorRecord('mapping.missing_copy', path, mapping_type, mapping, name)
 
-        if not to_path.startswith('/') and not to_path.startswith('$'):
-            error_dict[mapping_type] = [
-                f'{mapping_type} item {mapping} on module {name} on path "{to_path}" is invalid. Only absolute paths allowed'
-            ]
-            return
+    for mapping_path in (from_path, to_path):
+        if mapping_invalid_variable_pattern.search(mapping_path):
+            return ErrorRecord(
+                'mapping.invalid_variable', path, mapping_type, mapping, name, mapping_path
+            )
 
-        if not from_path.startswith('/') and not from_path.startswith('$'):
-            error_dict[mapping_type] = [
-                f'{mapping_type} item {mapping} on module {name} on path "{from_path}" is invalid. Only absolute paths allowed'
-            ]
-            return
+    if from_path.endswith('/') and not to_path.endswith('/') and not mapping_trailing_variable_pattern.search(to_path):
+        return ErrorRecord('mapping.directory_to_file', path, mapping_type, mapping, name)
 
-        if '//' in from_path or '//' in to_path:
-            error_dict[mapping_type] = [
-                f'{mapping_type} item {mapping} on module {name} is invalid. Directories can not have consecutive slashes'
-            ]
+    for mapping_path in (to_path, from_path):
+        if not mapping_path.startswith(('/', '$')):
+            return ErrorRecord(
+                'mapping.relative_path', path, mapping_type, mapping, name, mapping_path
+            )
+
+    if '//' in from_path or '//' in to_path:
+        return ErrorRecord('mapping.consecutive_slashes', path, mapping_type, mapping, name)
+
+    return None
+
+class MappingDestinationIndex:
+    """Trie of the to_path of the file mappings of a module, one node per path component.
+
+    A to_path ending in "/" is a directory, any other is a file. Adding a path walks at most
+    its own components, so checking all mappings of a module takes linear time in their length.
+    The mapping stored with a path can be any value, it is returned as is on a conflict.
+    """
+
+    def __init__(self):
+        # Each node is [children, mapping copying a file to it, first mapping using it as a directory]
+        self.root = [{}, None, None]
+
+    def add(self, to_path: str, mapping: Any) -> Tuple[Optional[Any], Optional[str]]:
+        """Add a to_path, returning the mapping it conflicts with and the path that is both a file and a directory.
+
+        Returns (None, None) without a conflict and (mapping, None) for a file copied to the same path twice.
+        """
+        # Consecutive slashes are rejected before, so only the ends can be empty
+        stripped_path = to_path.strip('/')
+        components = stripped_path.split('/') if stripped_path else []
+        is_directory = to_path.endswith('/')
+        directory_components = components if is_directory else components[:-1]
+        node = self.root
+        for depth, component in enumerate(directory_components):
+            children = node[0]
+            node = children.get(component)
+            if node is None:
+                node = children[component] = [{}, None, mapping]
+            elif node[1] is not None:
+                return node[1], '/' + '/'.join(components[:depth + 1])
+
+        if not is_directory:
+            children = node[0]
+            node = children.get(components[-1])
+            if node is None:
+                children[components[-1]] = [{}, mapping, None]
+            elif node[1] is not None:
+                return node[1], None
+            else:
+                return node[2], '/' + stripped_path
+        return None, None
+
+def validate_source_file_paths(name: str, task_data: Dict[str, Any], error_dict: Dict[str, Any], file_index: AppFileIndex) -> None:
+    """Validate that the from_path of each valid source_files mapping exists in the app directory."""
+    if 'source_files' in error_dict or not isinstance(task_data.get('source_files'), list):
+        return
+
+    errors = []
+    for index, mapping in enumerate(task_data['source_files']):
+        from_path = mapping.split(' ', 2)[1]
+        if '$' in from_path:
+            continue
+        if from_path.endswith('/'):
+            exists = file_index.is_directory(from_path)
+        else:
+            exists = file_index.is_file(from_path) or file_index.is_directory(from_path)
+        if not exists:
+            errors.append(ErrorRecord(
+                'mapping.missing_source', ('modules', name, 'source_files', index),
+                mapping, name, from_path, file_index.root,
+            ))
+    if errors:
+        error_dict['source_files'] = errors
 
 def validate_image(name: str, task_data: Dict[str, Any], error_dict: Dict[str, Any], yaml_version: int) -> None:
     """Validate image field."""
     if 'image' not in task_data:
-        error_dict['image'] = [
-            f'You must define an image to use for module {name}.'
-        ]
+        error_dict['image'] = [ErrorRecord('image.missing', ('modules', name), name)]
         return
 
     image = task_data['image']
     if '://' not in image:
-        error_dict['image'] = [
-            f'Wrong image format on module {name}. You must define an image using the following format "environment://image_name:version"'
-        ]
+        error_dict['image'] = [ErrorRecord('image.invalid_format', ('modules', name, 'image'), name)]
         return
 
     environment = image.split('://')[0]
-    if environment not in AllowedYAMLEnvironments.values():
-        error_dict['image'] = [
-            f'Wrong environment on image of module {name}. The environment should be specified before "://" and can be only be one of {AllowedYAMLEnvironments.values()}'
-        ]
+    if environment not in allowed_yaml_environment_set:
+        error_dict['image'] = [ErrorRecord(
+            'image.invalid_environment', ('modules', name, 'image'),
+            name, allowed_yaml_environments, environment,
+        )]
 
     if image.startswith(f'{AllowedYAMLEnvironments.BIOLIB_APP}://biolib/'):
         uri = image.replace(f'{AllowedYAMLEnvironments.BIOLIB_APP}://biolib/', '', 1)
         if uri.count(':') != 1:
-            error_dict['image'] = [
-                f'Missing version on the image of module {name}. A version must be specified at the end of the image like so: "environment://image_name:version"'
-            ]
+            error_dict['image'] = [ErrorRecord('image.missing_version', ('modules', name, 'image'), name)]
             return
 
         executor, version = uri.split(':')
-        if executor not in custom_executors.keys():
-            error_dict['image'] = [
-                f'Invalid image name biolib/{executor} for biolib executor on module {name}. The supported biolib executors are {["biolib/" + executor for executor in custom_executors.keys()]}'
-            ]
+        if executor not in custom_executors:
+            error_dict['image'] = [ErrorRecord(
+                'image.invalid_executor', ('modules', name, 'image'),
+                executor, name, biolib_executor_image_names,
+            )]
             return
 
-        supported_versions = custom_executors[executor]['versions'] + ['*']
-        if version not in supported_versions:
-            error_dict['image'] = [
-                f'Invalid version for biolib executor {executor} on module {name}. The supported versions for {executor} are {supported_versions}'
-            ]
+        supported_versions = custom_executor_supported_versions[executor]
+        if version not in custom_executor_supported_version_sets[executor]:
+            error_dict['image'] = [ErrorRecord(
+                'image.invalid_version', ('modules', name, 'image'),
+                executor, name, supported_versions,
+            )]
             return
 
-def validate_gpu(yaml_data: Dict[str, Any], error_dict: Dict[str, Any]) -> None:
+def validate_gpu(name: str, yaml_data: Dict[str, Any], error_dict: Dict[str, Any]) -> None:
     """Validate gpu field."""
     if 'gpu' in yaml_data.keys():
-        if yaml_data['gpu'] not in ModuleGpuPreference.values():
-            error_dict['gpu'] = [
-                f'Invalid value for "gpu". You can specify one of {ModuleGpuPreference.values()}'
-            ]
+        if not is_valid_choice(yaml_data['gpu'], module_gpu_preference_set):
+            error_dict['gpu'] = [ErrorRecord('gpu.invalid', ('modules', name, 'gpu'), module_gpu_preferences)]
 
-def validate_default_machine(yaml_data: Dict[str, Any], error_dict: Dict[str, Any]) -> None:
+def validate_default_machine(name: str, yaml_data: Dict[str, Any], error_dict: Dict[str, Any]) -> None:
     """Validate default_machine field."""
     if 'default_machine' in yaml_data:
+        path = ('modules', name, 'default_machine')
         if yaml_data['default_machine'] not in biolib_machine_type_to_resource_requirements:
-            error_dict['default_machine'] = ['Invalid machine type']
+            error_dict['default_machine'] = [ErrorRecord('default_machine.invalid', path, yaml_data['default_machine'])]
 
         if 'gpu' in yaml_data:
-            error_dict['default_machine'] = ['Cannot be specified with the "gpu" option']
+            error_dict['default_machine'] = [ErrorRecord('default_machine.gpu_conflict', path)]
 
-def validate_disable_default_machine_override(yaml_data: Dict[str, Any], error_dict: Dict[str, Any]) -> None:
+def validate_disable_default_machine_override(name: str, yaml_data: Dict[str, Any], error_dict: Dict[str, Any]) -> None:
     """Validate disable_default_machine_override field."""
     if 'disable_default_machine_override' in yaml_data:
         if not isinstance(yaml_data['disable_default_machine_override'], bool):
-            error_dict['disable_default_machine_override'] = ['Must be boolean']
+            error_dict['disable_default_machine_override'] = [ErrorRecord(
+                'disable_default_machine_override.not_boolean', ('modules', name, 'disable_default_machine_override')
+            )]
 
 def validate_unsupported_task_fields(name: str, task_data: Dict[str, Any], error_dict: Dict[str, Any], yaml_version: int) -> None:
     """Validate that only supported task fields are present."""
     if not isinstance(task_data, dict):
         error_dict['unsupported_fields'] = [
-            f'Module {name} is the wrong type. Modules can only be a YAML dict in version {yaml_version}'
+            ErrorRecord('module.wrong_type', ('modules', name), name, yaml_version)
         ]
         return
 
-    supported_task_fields_base = [
-        'working_directory',
-    ]
-
-    supported_task_fields_v1 = [
-        'executor',
-        'path'
-    ]
-
-    supported_task_fields_v2 = [
-        'image',
-        'input_files',
-        'output_files',
-        'source_files',
-        'large_file_systems',
-        'data_records',
-        'command',
-        'gpu',
-        'secrets',
-        'default_machine',
-        'disable_default_machine_override',
-    ]
-
-    if yaml_version == 1:
-        supported_fields = supported_task_fields_base + supported_task_fields_v1
-    else:
-        supported_fields = supported_task_fields_base + supported_task_fields_v2
+    supported_fields = supported_task_field_sets[1 if yaml_version == 1 else 2]
 
     errors = []
     for field in task_data.keys():
         if field not in supported_fields:
             if field in ('required_cpu_in_nano_shares', 'required_memory_in_bytes'):
-                errors.append(f'The field "{field}" has been deprecated please use "default_machine" instead')
+                errors.append(ErrorRecord('module.deprecated_field', ('modules', name, field), field))
             else:
-                errors.append(f'The field "{field}" on module "{name}" is invalid for "biolib_version: {yaml_version}"')
+                errors.append(ErrorRecord(
+                    'module.unsupported_field', ('modules', name, field),
+                    field, name, yaml_version,
+                ))
 
     if errors:
         error_dict['unsupported_fields'] = errors
 
-def validate_argument(argument_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Validate an argument configuration."""
+def validate_argument(argument_data: Dict[str, Any], index: Optional[int] = None) -> Dict[str, Any]:
+    """Validate an argument configuration.
+
+    index is the position of the argument in the arguments list, part of the path of its errors.
+    """
     error_dict = {}
-    key = validate_key(argument_data, error_dict)
+    path = ('arguments', index)
+    key = validate_key(argument_data, error_dict, path)
     if key is None:
         return error_dict
 
     error_dict[key] = {}
     argument_error_dict = error_dict[key]
 
-    validate_unsupported_argument_fields(key, argument_data, argument_error_dict)
+    validate_unsupported_argument_fields(key, argument_data, argument_error_dict, path)
 
     sub_arguments = argument_data.get('sub_arguments', {})
     group_arguments = argument_data.get('group_arguments', [])
 
     if sub_arguments and group_arguments:
-        argument_error_dict['sub_arguments'] = ['Only one of `sub_arguments` or `group_arguments` can be specified']
+        argument_error_dict['sub_arguments'] = [ErrorRecord('argument.sub_and_group_arguments', path)]
 
-    validate_required(key, argument_data, argument_error_dict)
-    type_value = validate_type(key, argument_data, argument_error_dict)
+    validate_required(key, argument_data, argument_error_dict, path)
+    type_value = validate_type(key, argument_data, argument_error_dict, path)
 
     if not type_value:
         return error_dict
 
-    validate_description(key, argument_data, type_value, argument_error_dict)
+    validate_description(key, argument_data, type_value, argument_error_dict, path)
 
     if error_dict[key]:
         return error_dict
     else:
         return {}
 
-def validate_key(argument_data: Dict[str, Any], error_dict: Dict[str, Any]) -> Optional[str]:
+def validate_key(argument_data: Dict[str, Any], error_dict: Dict[str, Any], path: Tuple) -> Optional[str]:
     """Validate argument key."""
     if 'key' not in argument_data.keys():
-        error_dict['required'] = [
-            f'One of your arguments is missing a key. Please specify a key for each of your arguments'
-        ]
+        error_dict['required'] = [ErrorRecord('argument.missing_key', path)]
         return None
     else:
         return argument_data['key']
 
-def validate_required(key: str, argument_data: Dict[str, Any], error_dict: Dict[str, Any]) -> None:
+def validate_required(key: str, argument_data: Dict[str, Any], error_dict: Dict[str, Any], path: Tuple) -> None:
     """Validate required field."""
     if 'required' in argument_data.keys():
         if not isinstance(argument_data['required'], bool):
-            error_dict['required'] = [
-                f'Invalid value in required specified on {key} argument. required can be true or false'
-            ]
+            error_dict['required'] = [ErrorRecord('required.not_boolean', path + ('required',), key)]
 
-def validate_type(key: str, argument_data: Dict[str, Any], error_dict: Dict[str, Any]) -> Optional[str]:
+def validate_type(key: str, argument_data: Dict[str, Any], error_dict: Dict[str, Any], path: Tuple) -> Optional[str]:
     """Validate type field."""
     if 'type' in argument_data.keys():
-        render_types_choices = [type_tuple[0] for type_tuple in render_types]
         type_value = argument_data['type']
-        if type_value not in render_types_choices:
-            error_dict['type'] = [
-                f'Invalid value {type_value} in type specified on {key} argument '
-                f'type can be one of {render_types_choices}'
-            ]
+        if not is_valid_choice(type_value, render_types_choice_set):
+            error_dict['type'] = [ErrorRecord(
+                'type.invalid', path + ('type',),
+                type_value, key, render_types_choices,
+            )]
             return ''
 
         if type_value == 'toggle':
             if 'options' not in argument_data:
-                error_dict['type'] = [
-                    f'There must be exactly 2 options ("on" and "off") on arguments of type toggle'
-                ]
+                error_dict['type'] = [ErrorRecord('type.toggle_missing_options', path + ('type',))]
                 return ''
 
             number_of_options = len(argument_data['options'].keys())
 
             if number_of_options != 2:
                 error_dict['type'] = [
-                    f'There must be exactly 2 options ("on" and "off") on arguments of type toggle. Received '
-                    f'{number_of_options} options'
+                    ErrorRecord('type.toggle_option_count', path + ('options',), number_of_options)
                 ]
                 return ''
 
             option_names = list(argument_data['options'].keys())
 
             if option_names not in (['on', 'off'], ['off', 'on']):
-                error_dict['type'] = [
-                    f'The two options on arguments of type toggle must be named "on" and "off". Received '
-                    f'{", ".join(option_names)}'
-                ]
+                error_dict['type'] = [ErrorRecord(
+                    'type.toggle_option_names', path + ('options',),
+                    ', '.join(option_names),
+                )]
                 return ''
 
         return type_value
     return None
 
-def validate_description(key: str, argument_data: Dict[str, Any], type_value: str, error_dict: Dict[str, Any]) -> None:
+def validate_description(
+        key: str,
+        argument_data: Dict[str, Any],
+        type_value: str,
+        error_dict: Dict[str, Any],
+        path: Tuple,
+) -> None:
     """Validate description field."""
     if 'description' not in argument_data.keys() and type_value != 'hidden':
-        error_dict['argument_description'] = [
-            f'Could not find a description for argument {key}. Please provide a description for {key}'
-        ]
+        error_dict['argument_description'] = [ErrorRecord('argument.missing_description', path, key)]
 
-def validate_unsupported_argument_fields(key: str, argument_data: Dict[str, Any], error_dict: Dict[str, Any]) -> None:
+def validate_unsupported_argument_fields(key: str, argument_data: Dict[str, Any], error_dict: Dict[str, Any], path: Tuple) -> None:
     """Validate that only supported argument fields are present."""
-    supported_argument_fields = [
-        'default_value',
-        'description',
-        'do_not_pass_if_value_empty',
-        'exclude_value',
-        'key',
-        'key_value_separator',
-        'options',
-        'required',
-        'sub_arguments',
-        'type',
-        'group_arguments',
-        'group_separator',
-        'group_argument_separator',
-    ]
-
     for field in argument_data.keys():
-        if field not in supported_argument_fields:
+        if field not in supported_argument_field_set:
             error_dict['unsupported_field'] = [
-                f'The argument field {field} on {key} is not valid'
+                ErrorRecord('argument.unsupported_field', path + (field,), field, key)
             ]
 
-def validate_tasks(yaml_data: Dict[str, Any], yaml_version: int) -> Dict[str, Any]:
-    """Validate tasks in the YAML configuration."""
-    error_dict = {'modules': {}}
-    if 'modules' in yaml_data:
-        for name, task_data in yaml_data['modules'].items():
-            task_errors = validate_task(
-                name=name,
-                task_data=task_data,
-                yaml_version=yaml_version,
-            )
-            if task_errors:
-                error_dict['modules'].update(task_errors)
+def merge_entry_errors(section: str, entries_errors: Iterable[Dict[str, Any]], budget: Optional[ErrorBudget] = None) -> Dict[str, Any]:
+    """Merge the errors of each module or argument into the error dict of their section."""
+    error_dict = {section: {}}
+    for entry_errors in entries_errors:
+        if entry_errors:
+            error_dict[section].update(entry_errors)
+            if budget is not None:
+                budget.add(entry_errors)
+                if budget.is_exhausted():
+                    break
 
-    if error_dict['modules']:
+    if error_dict[section]:
         return error_dict
     else:
         return {}
 
-def validate_arguments(yaml_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Validate arguments in the YAML configuration."""
-    error_dict = {'arguments': {}}
-    if 'arguments' in yaml_data:
-        for argument in yaml_data['arguments']:
-            argument_errors = validate_argument(argument)
-            if argument_errors:
-                error_dict['arguments'].update(argument_errors)
+def validate_tasks(
+        yaml_data: Dict[str, Any],
+        yaml_version: int,
+        budget: Optional[ErrorBudget] = None,
+        file_index: Optional[AppFileIndex] = None,
+        memo: Optional[SubtreeMemo] = None,
+) -> Dict[str, Any]:
+    """Validate tasks in the YAML configuration, reusing the errors of unchanged modules from memo."""
+    if 'modules' not in yaml_data:
+        return {}
 
-    if error_dict['arguments']:
-        return error_dict
-    else:
+    validate = memo.validate_task if memo is not None else validate_task
+    tasks_errors = (
+        validate(name=name, task_data=task_data, yaml_version=yaml_version, file_index=file_index)
+        for name, task_data in yaml_data['modules'].items()
+    )
+    return merge_entry_errors('modules', tasks_errors, budget)
+
+def validate_arguments(yaml_data: Dict[str, Any], budget: Optional[ErrorBudget] = None) -> Dict[str, Any]:
+    """Validate arguments in the YAML configuration."""
+    if 'arguments' not in yaml_data:
         return {}
 
-def validate_yaml_config(yaml_data: Dict[str, Any], yaml_version: int) -> None:
-    """Validate the YAML configuration."""
+    arguments_errors = (validate_argument(argument, index) for index, argument in enumerate(yaml_data['arguments']))
+    return merge_entry_errors('arguments', arguments_errors, budget)
+
+def validate_yaml_config(
+        yaml_data: Dict[str, Any],
+        yaml_version: int,
+        max_errors: Optional[int] = None,
+        tasks_errors: Optional[Iterable[Dict[str, Any]]] = None,
+        arguments_errors: Optional[Iterable[Dict[str, Any]]] = None,
+        file_index: Optional[AppFileIndex] = None,
+        upload_estimator: Optional[UploadSetEstimator] = None,
+        memo: Optional[SubtreeMemo] = None,
+) -> None:
+    """Validate the YAML configuration.
+
+    Checks run in a fixed order, cheapest first: the root level checks in the order of
+    app_version_field_validators, then each module in document order, then each argument
+    in document order. With max_errors, validation stops as soon as that many error
+    messages were found after any of these steps, so slightly more errors may be reported.
+
+    tasks_errors and arguments_errors can hold the results of validate_task and
+    validate_argument computed up front, as done by StreamingValidator. With file_index, files
+    referenced by the config must exist in the app directory it indexes. With upload_estimator,
+    the upload set of the app is estimated and checked against its size limit. With memo, the
+    errors of modules validated before are reused, see SubtreeMemo.
+    """
     error_dict = {'config_yml': {}}
+    budget = ErrorBudget(max_errors) if max_errors is not None else None
     
-    app_version_errors = validate_app_version(yaml_data)
+    app_version_errors = validate_app_version(
+        yaml_data,
+        budget=budget,
+        file_index=file_index,
+        upload_estimator=upload_estimator,
+    )
     if app_version_errors:
         error_dict['config_yml'].update(app_version_errors)
+        if budget is not None:
+            budget.add(app_version_errors)
     
-    task_errors = validate_tasks(yaml_data, yaml_version)
-    if task_errors:
-        error_dict['config_yml'].update(task_errors)
+    if budget is None or not budget.is_exhausted():
+        if tasks_errors is not None:
+            task_errors = merge_entry_errors('modules', tasks_errors, budget)
+        else:
+            task_errors = validate_tasks(yaml_data, yaml_version, budget=budget, file_index=file_index, memo=memo)
+        if task_errors:
+            error_dict['config_yml'].update(task_errors)
     
-    argument_errors = validate_arguments(yaml_data)
-    if argument_errors:
-        error_dict['config_yml'].update(argument_errors)
+    if budget is None or not budget.is_exhausted():
+        if arguments_errors is not None:
+            argument_errors = merge_entry_errors('arguments', arguments_errors, budget)
+        else:
+            argument_errors = validate_arguments(yaml_data, budget=budget)
+        if argument_errors:
+            error_dict['config_yml'].update(argument_errors)
     
     if error_dict['config_yml']:
         raise ValidationError(error_dict)
 
-def print_validation_errors(error: ValidationError) -> None:
+def print_validation_errors(error: ValidationError, file: Optional[TextIO] = None) -> None:
     """Print validation errors in a user-friendly format."""
-    print("Validation errors:")
+    print("Validation errors:", file=file)
     
     if isinstance(error.detail, dict):
         for section, section_errors in error.detail.items():
-            print(f"\n[{section}]")
+            print(f"\n[{section}]", file=file)
             
             if isinstance(section_errors, dict):
                 for field, field_errors in section_errors.items():
-                    print(f"  {field}:")
+                    print(f"  {field}:", file=file)
                     if isinstance(field_errors, list):
                         for err in field_errors:
-                            if isinstance(err, str):
-                                print(f"    - {err}")
+                            if isinstance(err, (str, ErrorRecord)):
+                                print(f"    - {err}", file=file)
                             elif isinstance(err, dict):
                                 for sub_field, sub_errors in err.items():
-                                    print(f"    - {sub_field}: {', '.join(sub_errors)}")
+                                    print(f"    - {sub_field}: {', '.join(map(str, sub_errors))}", file=file)
                     else:
-                        print(f"    - {field_errors}")
+                        print(f"    - {field_errors}", file=file)
             elif isinstance(section_errors, list):
                 for err in section_errors:
-                    print(f"  - {err}")
+                    print(f"  - {err}", file=file)
             else:
-                print(f"  {section_errors}")
+                print(f"  {section_errors}", file=file)
     else:
-        print(error.detail)
+        print(error.detail, file=file)
 
-def main():
-    """Main function to validate a config.yml file."""
-    parser = argparse.ArgumentParser(description='Validate a .biolib/config.yml file.')
-    parser.add_argument('config_file', help='Path to the config.yml file')
-    args = parser.parse_args()
-    
-    config_file = args.config_file
-    
-    if not os.path.exists(config_file):
-        print(f"Error: File '{config_file}' does not exist.")
-        sys.exit(1)
-    
+def get_yaml_loader():
+    """Return the YAML loader class, preferring the libyaml based one which parses several times faster."""
+    yaml = import_yaml()
+    return getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+def load_yaml(stream: Any, limits: Optional[LoaderLimits] = None) -> Tuple[Any, Any]:
+    """Parse a YAML document once, returning both the data and the node tree holding source positions.
+
+    With limits, the document is composed by the event loader, which raises LoaderLimitError
+    as soon as one is exceeded.
+    """
+    loader = get_yaml_loader()(stream) if limits is None else get_event_loader()(stream, limits=limits)
     try:
-        with open(config_file, 'r') as f:
-            yaml_data = yaml.safe_load(f)
-        
-        if yaml_data is None:
-            print("Error: Empty YAML file.")
-            sys.exit(1)
-        
-        yaml_version = validate_and_get_biolib_yaml_version(yaml_data)
-        
-        validate_yaml_config(yaml_data, yaml_version)
-        
-        print(f"Validation successful: '{config_file}' is valid.")
-        sys.exit(0)
-        
-    except yaml.YAMLError as e:
-        print(f"Error: Malformed YAML: {e}")
-        sys.exit(1)
-    except ValidationError as e:
-        print_validation_errors(e)
-        sys.exit(1)
-    except Exception as e:
-        print(f"Error: {e}")
-        sys.exit(1)
+        root_node = loader.get_single_node()
+        yaml_data = loader.construct_document(root_node) if root_node is not None else None
+        return yaml_data, root_node
+    finally:
+        loader.dispose()
+
+def get_node_marks(root_node: Any, max_depth: int = 4) -> Dict[Tuple, Tuple[int, int, int, int]]:
+    """Map document paths, e.g. ('modules', 'main', 'image'), to 1-based (line, column, end_line, end_column) ranges.
+
+    The range of a mapping entry is that of its key and the range of a sequence item that of the
+    item, the root is mapped to an empty range at its start. Paths are at most max_depth long, as
+    long as the paths of errors, e.g. ('modules', 'main', 'input_files', 0).
+    """
+    marks = {}
+    if root_node is None:
+        return marks
+
+    line, column = root_node.start_mark.line + 1, root_node.start_mark.column + 1
+    marks[()] = (line, column, line, column)
+    add_node_marks(marks, root_node, (), max_depth)
+    return marks
+
+def get_node_range(node: Any) -> Tuple[int, int, int, int]:
+    """Return the 1-based (line, column, end_line, end_column) range of a node."""
+    return node.start_mark.line + 1, node.start_mark.column + 1, node.end_mark.line + 1, node.end_mark.column + 1
+
+def add_node_marks(marks: Dict[Tuple, Tuple[int, int, int, int]], node: Any, path: Tuple, max_depth: int = 4) -> None:
+    """Add the ranges of the entries below node, which is at path in the document, to marks."""
+    yaml = import_yaml()
+
+    def add_node(node, path):
+        if len(path) >= max_depth:
+            return
+        if isinstance(node, yaml.MappingNode):
+            for key_node, value_node in node.value:
+                if isinstance(key_node, yaml.ScalarNode):
+                    key_path = path + (key_node.value,)
+                    marks[key_path] = get_node_range(key_node)
+                    add_node(value_node, key_path)
+        elif isinstance(node, yaml.SequenceNode):
+            for index, item_node in enumerate(node.value):
+                item_path = path + (index,)
+                marks[item_path] = get_node_range(item_node)
+                add_node(item_node, item_path)
+
+    add_node(node, path)
+
+def get_argument_indexes(yaml_data: Any) -> Dict[Any, int]:
+    """Map argument keys to their index in the arguments list, errors are keyed by the argument key."""
+    arguments = yaml_data.get('arguments') if isinstance(yaml_data, dict) else None
+    if not isinstance(arguments, list):
+        return {}
+    return {argument.get('key'): index for index, argument in enumerate(arguments) if isinstance(argument, dict)}
+
+def get_edit_distance(a: str, b: str) -> int:
+    """Return the Levenshtein distance between two strings."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous_row = list(range(len(b) + 1))
+    for i, a_char in enumerate(a, 1):
+        row = [i]
+        for j, b_char in enumerate(b, 1):
+            row.append(min(previous_row[j] + 1, row[j - 1] + 1, previous_row[j - 1] + (a_char != b_char)))
+        previous_row = row
+    return previous_row[-1]
+
+class SuggestionIndex:
+    """BK-tree over a vocabulary, finding the words within an edit distance of a typo.
+
+    The triangle inequality lets a search skip every subtree whose distance to its parent is
+    out of range, so a lookup compares against a small part of the vocabulary.
+    """
+
+    def __init__(self, words: Iterable[str]):
+        self.root = None
+        for word in words:
+            self.add(word)
+
+    def add(self, word: str) -> None:
+        # Each node is (word, {distance: child node})
+        if self.root is None:
+            self.root = (word, {})
+            return
+        node = self.root
+        while True:
+            distance = get_edit_distance(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (word, {})
+                return
+            node = child
+
+    def search(self, word: str, max_distance: int) -> List[Tuple[int, str]]:
+        """Return (distance, word) for the words within max_distance, closest first."""
+        matches = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node_word, children = stack.pop()
+            distance = get_edit_distance(word, node_word)
+            if distance <= max_distance:
+                matches.append((distance, node_word))
+            for child_distance, child in children.items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        return sorted(matches)
+
+# Vocabularies of the enumerated fields, their indexes are built on first use
+suggestion_vocabularies = {
+    'root_field': lambda: supported_root_level_fields,
+    'task_field_1': lambda: sorted(supported_task_field_sets[1]),
+    'task_field_2': lambda: sorted(supported_task_field_sets[2]),
+    'argument_field': lambda: supported_argument_fields,
+    'argument_type': lambda: render_types_choices,
+    'output_type': lambda: stdout_render_types_choices,
+    'machine_type': lambda: list(biolib_machine_type_to_resource_requirements.keys()),
+    'image_environment': lambda: allowed_yaml_environments,
+    'biolib_executor': lambda: list(custom_executors.keys()),
+}
+suggestion_indexes = {}
+# Suggestions by (vocabulary, value), editors revalidate on every keystroke and repeat the same typos
+suggestion_cache = {}
+suggestion_cache_max_entries = 4096
+
+# Vocabulary of each error code about an enumerated value and the index of the param holding the invalid value
+suggestion_error_codes = {
+    'root.unsupported_field': ('root_field', 0),
+    'module.unsupported_field': ('task_field', 0),
+    'argument.unsupported_field': ('argument_field', 0),
+    'type.invalid': ('argument_type', 0),
+    'image.invalid_executor': ('biolib_executor', 0),
+    'output_type.invalid': ('output_type', 1),
+    'default_machine.invalid': ('machine_type', 0),
+    'image.invalid_environment': ('image_environment', 2),
+}
+
+def get_suggestions(vocabulary: str, value: Any, limit: int = 3) -> List[str]:
+    """Return up to limit valid values of a vocabulary closest to an invalid value."""
+    if not isinstance(value, str) or not value:
+        return []
+    suggestions = suggestion_cache.get((vocabulary, value, limit))
+    if suggestions is not None:
+        return suggestions
+
+    index = suggestion_indexes.get(vocabulary)
+    if index is None:
+        index = suggestion_indexes[vocabulary] = SuggestionIndex(suggestion_vocabularies[vocabulary]())
+    # Allow about one typo per three characters
+    max_distance = max(1, len(value) // 3)
+    suggestions = [word for _, word in index.search(value.strip().lower(), max_distance)[:limit]]
+    if len(suggestion_cache) >= suggestion_cache_max_entries:
+        suggestion_cache.clear()
+    suggestion_cache[(vocabulary, value, limit)] = suggestions
+    return suggestions
+
+def add_suggestions(detail: Any) -> Any:
+    """Return the error detail with "Did you mean" suggestions appended to errors about enumerated values."""
+    if isinstance(detail, dict):
+        return {key: add_suggestions(value) for key, value in detail.items()}
+    if isinstance(detail, list):
+        return [add_suggestions(item) for item in detail]
+    if not isinstance(detail, ErrorRecord) or detail.code not in suggestion_error_codes:
+        return detail
+
+    vocabulary, index = suggestion_error_codes[detail.code]
+    if vocabulary == 'task_field':
+        vocabulary = f"task_field_{detail.params[2]}"
+    suggestions = get_suggestions(vocabulary, detail.params[index])
+    if not suggestions:
+        return detail
+    return SuggestedErrorRecord(detail, suggestions)
+
+def get_error_locations(
+        detail: Any,
+        marks: Dict[Tuple, Tuple[int, int, int, int]],
+        argument_indexes: Dict[Any, int],
+) -> List[Dict[str, Any]]:
+    """Flatten validation errors into messages with the document path and range they refer to.
+
+    marks is returned by get_node_marks and argument_indexes by get_argument_indexes. Error
+    records are located at the node of their path, other messages at the node of their key in
+    detail. Errors are attributed to the closest node of the document that exists, so e.g. a
+    missing image is reported at the module it is missing from.
+    """
+    locations = []
+
+    def get_range(path):
+        while path and path not in marks:
+            path = path[:-1]
+        return marks.get(path, (None, None, None, None))
+
+    def add_errors(path, errors):
+        if isinstance(errors, dict):
+            for field, field_errors in errors.items():
+                add_errors(path + (field,), field_errors)
+            return
+
+        for message in (errors if isinstance(errors, list) else [errors]):
+            # Messages of error records are rendered when a reporter formats them
+            line, column, end_line, end_column = get_range(message.path if isinstance(message, ErrorRecord) else path)
+            locations.append({
+                'path': list(path),
+                'message': message,
+                'line': line,
+                'column': column,
+                'end_line': end_line,
+                'end_column': end_column,
+            })
+
+    config_errors = detail.get('config_yml') if isinstance(detail, dict) else detail
+    if not isinstance(config_errors, dict):
+        add_errors((), config_errors)
+        return locations
+
+    for field, field_errors in config_errors.items():
+        if field == 'arguments' and isinstance(field_errors, dict):
+            for key, argument_errors in field_errors.items():
+                if key in argument_indexes:
+                    add_errors(('arguments', argument_indexes[key]), argument_errors)
+                else:
+                    add_errors(('arguments',), argument_errors)
+        else:
+            add_errors((field,), field_errors)
+
+    return locations
+
+_event_loader = None
+
+def get_event_loader():
+    """Return a loader class composing nodes in Python from parser events.
+
+    The libyaml composer can only compose whole documents, this loader composes one subtree
+    at a time while still using the libyaml parser when it is available. Given LoaderLimits,
+    it counts nodes, nesting depth and alias expansions while composing.
+    """
+    global _event_loader
+    if _event_loader is None:
+        yaml = import_yaml()
+        if hasattr(yaml, 'CSafeLoader'):
+            from yaml._yaml import CParser
+
+            class EventLoaderBase(yaml.composer.Composer, CParser, yaml.constructor.SafeConstructor, yaml.resolver.Resolver):
+                def __init__(self, stream):
+                    CParser.__init__(self, stream)
+                    yaml.composer.Composer.__init__(self)
+                    yaml.constructor.SafeConstructor.__init__(self)
+                    yaml.resolver.Resolver.__init__(self)
+        else:
+            EventLoaderBase = yaml.SafeLoader
+
+        class EventLoader(EventLoaderBase):
+            def __init__(self, stream, limits: Optional[LoaderLimits] = None):
+                super().__init__(stream)
+                self.limits = limits
+                self.node_count = 0
+                self.depth = 0
+                self.alias_expansions = 0
+                # Number of nodes each anchored node expands to, including the aliases within it
+                self.anchor_sizes = {}
+
+            def enter_node(self, event: Any) -> None:
+                """Count a node that is about to be composed, raising LoaderLimitError past a limit."""
+                limits = self.limits
+                if limits is None:
+                    return
+                self.node_count += 1
+                self.depth += 1
+                if self.node_count > limits.max_nodes:
+                    raise LoaderLimitError(
+                        f"Document has more than {limits.max_nodes} nodes.", event.start_mark
+                    )
+                if self.depth > limits.max_depth:
+                    raise LoaderLimitError(
+                        f"Document is nested more than {limits.max_depth} levels deep.", event.start_mark
+                    )
+                if isinstance(event, yaml.ScalarEvent) and len(event.value) > limits.max_scalar_length:
+                    raise LoaderLimitError(
+                        f"Scalar of {len(event.value)} characters is longer than the limit of "
+                        f"{limits.max_scalar_length} characters.",
+                        event.start_mark,
+                    )
+
+            def exit_node(self) -> None:
+                if self.limits is not None:
+                    self.depth -= 1
+
+            def compose_node(self, parent, index):
+                if self.limits is None:
+                    return super().compose_node(parent, index)
+
+                event = self.peek_event()
+                if isinstance(event, yaml.AliasEvent):
+                    size = self.anchor_sizes.get(event.anchor)
+                    if size is None and event.anchor in self.anchors:
+                        raise LoaderLimitError(
+                            f"Alias *{event.anchor} refers to a node containing itself.", event.start_mark
+                        )
+                    if size is not None:
+                        self.alias_expansions += size
+                        if self.alias_expansions > self.limits.max_alias_expansions:
+                            raise LoaderLimitError(
+                                f"Aliases expand to more than {self.limits.max_alias_expansions} nodes.",
+                                event.start_mark,
+                            )
+                    return super().compose_node(parent, index)
+
+                self.enter_node(event)
+                size_start = self.node_count + self.alias_expansions
+                node = super().compose_node(parent, index)
+                self.exit_node()
+                if event.anchor is not None:
+                    self.anchor_sizes[event.anchor] = self.node_count + self.alias_expansions - size_start + 1
+                return node
+
+        _event_loader = EventLoader
+    return _event_loader
+
+def get_loader_limit_result(config_file: str, error: LoaderLimitError) -> ValidationResult:
+    """Report an exceeded LoaderLimits like the other validation errors."""
+    location = {'path': [], 'message': error.message, 'line': None, 'column': None}
+    if error.mark is not None:
+        location['line'], location['column'] = error.mark.line + 1, error.mark.column + 1
+    return ValidationResult(
+        config_file,
+        ValidationResult.INVALID,
+        detail={'config_yml': {'yaml': [error.message]}},
+        locations=[location],
+    )
+
+class StreamingValidator:
+    """Validates a config while it is parsed, one module and argument at a time.
+
+    Each entry of the root level modules mapping and arguments list is composed, validated
+    and discarded, so peak memory is bounded by the largest entry rather than the whole
+    document. Modules are validated assuming biolib_version 2, the only supported version,
+    and those errors are dropped if the version turns out to be invalid, which gives the
+    same result as validating the loaded document. Documents that are not a mapping are
+    loaded and validated as a whole.
+
+    After validate() returns or raises, marks and argument_indexes hold what
+    get_error_locations needs to position the errors, and yaml_data the root level fields
+    except the streamed modules and arguments. Only entries with errors keep their errors and
+    marks, so what is kept of valid entries is at most their name.
+    """
+
+    def __init__(
+            self,
+            max_errors: Optional[int] = None,
+            limits: Optional[LoaderLimits] = None,
+            file_index: Optional[AppFileIndex] = None,
+            upload_estimator: Optional[UploadSetEstimator] = None,
+            memo: Optional[SubtreeMemo] = None,
+    ):
+        self.max_errors = max_errors
+        self.limits = limits
+        self.file_index = file_index
+        self.upload_estimator = upload_estimator
+        self.memo = memo
+        self.version = None
+        self.yaml_data = None
+        self.marks = {}
+        self.argument_indexes = {}
+
+    class WholeDocumentRequired(Exception):
+        """Raised for documents whose modules or arguments can not be validated one at a time."""
+
+    def validate(self, stream: Any) -> Optional[int]:
+        """Validate the config, returning its version or None if the document is empty.
+
+        Raises ValidationError like validate_and_get_biolib_yaml_version and validate_yaml_config.
+        Documents with merge keys, tags or complex keys on the root level or in the modules
+        mapping are validated as a whole, which requires stream to be seekable.
+        """
+        try:
+            return self._validate(stream, whole_document=False)
+        except StreamingValidator.WholeDocumentRequired:
+            stream.seek(0)
+            self.version = None
+            self.yaml_data = None
+            self.marks = {}
+            self.argument_indexes = {}
+            return self._validate(stream, whole_document=True)
+
+    def _validate(self, stream: Any, whole_document: bool) -> Optional[int]:
+        yaml = import_yaml()
+        loader = get_event_loader()(stream, limits=self.limits)
+        try:
+            loader.get_event()  # StreamStartEvent
+            if loader.check_event(yaml.StreamEndEvent):
+                return None
+
+            document_start_event = loader.get_event()
+            if whole_document or not self._is_plain_collection(loader.peek_event(), yaml.MappingStartEvent):
+                root_node = loader.compose_node(None, None)
+                self._end_document(loader, document_start_event)
+                yaml_data = self.yaml_data = loader.construct_document(root_node)
+                if yaml_data is None:
+                    return None
+                self.marks = get_node_marks(root_node)
+                self.version = validate_and_get_biolib_yaml_version(yaml_data)
+                validate_yaml_config(
+                    yaml_data,
+                    self.version,
+                    max_errors=self.max_errors,
+                    file_index=self.file_index,
+                    upload_estimator=self.upload_estimator,
+                    memo=self.memo,
+                )
+                return self.version
+
+            mapping_start_event = loader.get_event()
+            loader.enter_node(mapping_start_event)
+            line, column = mapping_start_event.start_mark.line + 1, mapping_start_event.start_mark.column + 1
+            self.marks[()] = (line, column, line, column)
+            yaml_data = self.yaml_data = {}
+            tasks_errors = None
+            arguments_errors = None
+            while not loader.check_event(yaml.MappingEndEvent):
+                key_node = loader.compose_node(None, None)
+                self._check_plain_key(key_node)
+                key = loader.construct_document(key_node)
+                self.marks[(key_node.value,)] = get_node_range(key_node)
+
+                if key == 'modules' and self._is_plain_collection(loader.peek_event(), yaml.MappingStartEvent):
+                    yaml_data[key] = {}
+                    tasks_errors = self._validate_modules(loader)
+                elif key == 'arguments' and self._is_plain_collection(loader.peek_event(), yaml.SequenceStartEvent):
+                    yaml_data[key] = []
+                    arguments_errors = self._validate_arguments(loader)
+                else:
+                    value_node = loader.compose_node(None, None)
+                    yaml_data[key] = loader.construct_document(value_node)
+                    # Marks are added after constructing, which resolves merge keys in place
+                    add_node_marks(self.marks, value_node, (key_node.value,))
+                    if key == 'modules':
+                        tasks_errors = None
+                    elif key == 'arguments':
+                        arguments_errors = None
+
+            loader.get_event()  # MappingEndEvent
+            loader.exit_node()
+            self._end_document(loader, document_start_event)
+        finally:
+            loader.dispose()
+
+        self.version = validate_and_get_biolib_yaml_version(yaml_data)
+        validate_yaml_config(
+            yaml_data,
+            self.version,
+            max_errors=self.max_errors,
+            tasks_errors=self._iter_entries_errors(tasks_errors.values()) if tasks_errors is not None else None,
+            arguments_errors=self._iter_entries_errors(arguments_errors) if arguments_errors is not None else None,
+            file_index=self.file_index,
+            upload_estimator=self.upload_estimator,
+        )
+        return self.version
+
+    @staticmethod
+    def _is_plain_collection(event: Any, event_type: type) -> bool:
+        # Anchored collections are composed whole so aliases can refer to them, tagged ones may
+        # construct to something else than a dict or list
+        return isinstance(event, event_type) and event.anchor is None and event.tag is None
+
+    @staticmethod
+    def _check_plain_key(key_node: Any) -> None:
+        # Merge keys are resolved over the whole mapping and complex keys may be unhashable,
+        # constructing the mapping at once handles both
+        yaml = import_yaml()
+        if not isinstance(key_node, yaml.ScalarNode) or key_node.tag == 'tag:yaml.org,2002:merge':
+            raise StreamingValidator.WholeDocumentRequired()
+
+    def _validate_modules(self, loader: Any) -> Dict[Any, Dict[str, Any]]:
+        yaml = import_yaml()
+        # Keyed by module name so a repeated name replaces the earlier module in place, as
+        # constructing the mapping would
+        tasks_errors = {}
+        loader.enter_node(loader.get_event())  # MappingStartEvent
+        while not loader.check_event(yaml.MappingEndEvent):
+            name_node = loader.compose_node(None, None)
+            self._check_plain_key(name_node)
+            name = loader.construct_document(name_node)
+            task_node = loader.compose_node(None, None)
+            task_data = loader.construct_document(task_node)
+            task_errors = self._validate_entry(
+                self.memo.validate_task if self.memo is not None else validate_task,
+                name=name, task_data=task_data, yaml_version=2, file_index=self.file_index
+            )
+            # Valid modules only keep their name, for the order of the modules after them
+            tasks_errors[name] = task_errors or None
+            if task_errors:
+                self.marks[('modules', name_node.value)] = get_node_range(name_node)
+                add_node_marks(self.marks, task_node, ('modules', name_node.value))
+        loader.get_event()  # MappingEndEvent
+        loader.exit_node()
+        return tasks_errors
+
+    def _validate_arguments(self, loader: Any) -> List[Dict[str, Any]]:
+        yaml = import_yaml()
+        arguments_errors = []
+        self.argument_indexes = {}
+        loader.enter_node(loader.get_event())  # SequenceStartEvent
+        index = 0
+        while not loader.check_event(yaml.SequenceEndEvent):
+            argument_node = loader.compose_node(None, None)
+            argument = loader.construct_document(argument_node)
+            argument_errors = self._validate_entry(validate_argument, argument, index)
+            key = argument.get('key') if isinstance(argument, dict) else None
+            # A later argument with the same key takes over its index, as in get_argument_indexes
+            if isinstance(argument, dict) and (argument_errors or key in self.argument_indexes):
+                self.argument_indexes[key] = index
+            if argument_errors:
+                arguments_errors.append(argument_errors)
+                self.marks[('arguments', index)] = get_node_range(argument_node)
+                add_node_marks(self.marks, argument_node, ('arguments', index))
+            index += 1
+        loader.get_event()  # SequenceEndEvent
+        loader.exit_node()
+        return arguments_errors
+
+    @staticmethod
+    def _validate_entry(validator: Callable, *args, **kwargs) -> Any:
+        # Exceptions are kept in place of the errors and raised by _iter_entries_errors, so parse
+        # errors take precedence like when validating the loaded document
+        try:
+            return validator(*args, **kwargs)
+        except Exception as e:
+            return e
+
+    @staticmethod
+    def _iter_entries_errors(entries_errors: Iterable[Any]) -> Iterator[Dict[str, Any]]:
+        # An exception is only raised once its entry is reached, validation may stop before
+        # that after max_errors like when validating the loaded document
+        for entry_errors in entries_errors:
+            if isinstance(entry_errors, Exception):
+                raise entry_errors
+            yield entry_errors
+
+    @staticmethod
+    def _end_document(loader: Any, document_start_event: Any) -> None:
+        yaml = import_yaml()
+        loader.get_event()  # DocumentEndEvent
+        if not loader.check_event(yaml.StreamEndEvent):
+            event = loader.get_event()
+            raise yaml.composer.ComposerError(
+                "expected a single document in the stream",
+                document_start_event.start_mark,
+                "but found another document",
+                event.start_mark,
+            )
+
+class AppFileIndex:
+    """Snapshot of the files and directories of an app directory, built in a single walk.
+
+    Paths in configs are relative to the app directory (see get_app_file_index), with or
+    without a leading slash. Looking them up in the snapshot avoids a stat call per
+    referenced path. The .git directory is not indexed.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.files = set()
+        self.directories = {''}
+        for directory, directory_names, file_names in os.walk(root):
+            if '.git' in directory_names:
+                directory_names.remove('.git')
+            relative_directory = os.path.relpath(directory, root).replace(os.sep, '/')
+            prefix = '' if relative_directory == '.' else relative_directory + '/'
+            self.directories.update(prefix + name for name in directory_names)
+            self.files.update(prefix + name for name in file_names)
+        self.created_at = time.monotonic()
+
+    @staticmethod
+    def normalize(path: str) -> str:
+        import posixpath
+
+        normalized = posixpath.normpath('/' + path).lstrip('/')
+        return '' if normalized == '.' else normalized
+
+    def is_file(self, path: str) -> bool:
+        return self.normalize(path) in self.files
+
+    def is_directory(self, path: str) -> bool:
+        return self.normalize(path) in self.directories
+
+# Indexes by app directory, shared by the configs of a batch and evicted oldest first. They
+# are rebuilt after app_file_index_max_age seconds so long running modes like --watch see new files.
+app_file_indexes = collections.OrderedDict()
+app_file_index_max_entries = 32
+app_file_index_max_age = 5.0
+
+def get_app_directory(config_file: str) -> Optional[str]:
+    """Return the app directory of a config file, or None if it is not a file on disk.
+
+    The app directory is the parent of the .biolib directory holding the config, or the directory
+    of the config if it is not in a .biolib directory.
+    """
+    if not os.path.isfile(config_file):
+        return None
+    root = os.path.dirname(os.path.abspath(config_file))
+    if os.path.basename(root) == '.biolib':
+        root = os.path.dirname(root)
+    return root
+
+def get_app_file_index(config_file: str) -> Optional[AppFileIndex]:
+    """Return the index of the app directory of a config file, or None if it is not a file on disk."""
+    root = get_app_directory(config_file)
+    if root is None:
+        return None
+    file_index = app_file_indexes.get(root)
+    if file_index is None or time.monotonic() - file_index.created_at > app_file_index_max_age:
+        file_index = AppFileIndex(root)
+        app_file_indexes[root] = file_index
+        while len(app_file_indexes) > app_file_index_max_entries:
+            try:
+                app_file_indexes.popitem(last=False)
+            except KeyError:
+                # Evicted by another thread
+                break
+    return file_index
+
+def format_size(size: int) -> str:
+    """Format a number of bytes for humans, e.g. "12.3 MB"."""
+    if size < 1000:
+        return f"{size} bytes"
+    for unit in ('kB', 'MB', 'GB'):
+        size /= 1000
+        if size < 1000:
+            break
+    else:
+        size /= 1000
+        unit = 'TB'
+    return f"{size:.1f} {unit}"
+
+def parse_size(value: str) -> int:
+    """Parse a number of bytes with an optional kB, MB, GB or TB suffix, e.g. "500MB"."""
+    match = re.fullmatch(r"\s*([0-9]+(?:\.[0-9]+)?)\s*(b|kb|mb|gb|tb)?\s*", value, re.IGNORECASE)
+    if match is None:
+        raise ValueError(f"Invalid size: {value}")
+    multipliers = {None: 1, 'b': 1, 'kb': 10 ** 3, 'mb': 10 ** 6, 'gb': 10 ** 9, 'tb': 10 ** 12}
+    return int(float(match.group(1)) * multipliers[match.group(2) and match.group(2).lower()])
+
+class IgnoreMatcher:
+    """Matches paths against source_files_ignore patterns, compiled into a few regular expressions.
+
+    Patterns without a slash match file and directory names at any depth, patterns with a slash
+    match paths relative to the app directory, and a trailing slash only matches directories.
+    Each path is matched once per compiled expression instead of once per pattern.
+    """
+
+    def __init__(self, patterns: List[str]):
+        name_patterns, path_patterns, directory_name_patterns, directory_path_patterns = [], [], [], []
+        for pattern in patterns:
+            is_directory_pattern = pattern.endswith('/')
+            pattern = pattern.rstrip('/')
+            if not pattern:
+                continue
+            if '/' in pattern:
+                target = directory_path_patterns if is_directory_pattern else path_patterns
+                target.append(pattern.lstrip('/'))
+            else:
+                target = directory_name_patterns if is_directory_pattern else name_patterns
+                target.append(pattern)
+        self.name_pattern = compile_glob_patterns(name_patterns)
+        self.path_pattern = compile_glob_patterns(path_patterns)
+        self.directory_name_pattern = compile_glob_patterns(directory_name_patterns)
+        self.directory_path_pattern = compile_glob_patterns(directory_path_patterns)
+
+    def is_ignored(self, relative_path: str, name: str, is_directory: bool) -> bool:
+        if self.name_pattern is not None and self.name_pattern.match(name):
+            return True
+        if self.path_pattern is not None and self.path_pattern.match(relative_path):
+            return True
+        if is_directory:
+            if self.directory_name_pattern is not None and self.directory_name_pattern.match(name):
+                return True
+            if self.directory_path_pattern is not None and self.directory_path_pattern.match(relative_path):
+                return True
+        return False
+
+class UploadSetEstimator:
+    """Counts the files and bytes uploaded for an app, its directory without .git and ignored paths.
+
+    The app directory is walked once with ignored directories pruned, so the cost depends on the
+    size of the upload set rather than of the whole tree.
+    """
+
+    def __init__(self, root: str, max_bytes: Optional[int] = None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.file_count = None
+        self.byte_count = None
+
+    def validate(self, yaml_data: Dict[str, Any], error_dict: Dict[str, Any]) -> None:
+        """Estimate the upload set, reporting invalid ignore patterns and uploads over max_bytes."""
+        patterns = yaml_data.get('source_files_ignore', [])
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        if not isinstance(patterns, list) or not all(isinstance(pattern, str) for pattern in patterns):
+            error_dict['source_files_ignore'] = [ErrorRecord('source_files_ignore.invalid', ('source_files_ignore',))]
+            return
+
+        self.file_count, self.byte_count = self.walk(IgnoreMatcher(patterns))
+        if self.max_bytes is not None and self.byte_count > self.max_bytes:
+            error_dict['source_files_ignore'] = [ErrorRecord(
+                'source_files_ignore.too_large', ('source_files_ignore',),
+                self.root, self.file_count, format_size(self.byte_count), format_size(self.max_bytes),
+            )]
+
+    def walk(self, matcher: IgnoreMatcher) -> Tuple[int, int]:
+        file_count = 0
+        byte_count = 0
+        stack = [(self.root, '')]
+        while stack:
+            directory, prefix = stack.pop()
+            try:
+                entries = os.scandir(directory)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    relative_path = prefix + entry.name
+                    try:
+                        is_directory = entry.is_dir(follow_symlinks=False)
+                        if is_directory and entry.name == '.git':
+                            continue
+                        if matcher.is_ignored(relative_path, entry.name, is_directory):
+                            continue
+                        if is_directory:
+                            stack.append((entry.path, relative_path + '/'))
+                        else:
+                            file_count += 1
+                            byte_count += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        return file_count, byte_count
+
+    def get_summary(self) -> Optional[Dict[str, int]]:
+        if self.file_count is None:
+            return None
+        return {'files': self.file_count, 'bytes': self.byte_count}
+
+def get_rule_set_fingerprint() -> str:
+    """Return a hash identifying the validation rules, used to invalidate cached results."""
+    global _rule_set_fingerprint
+    if _rule_set_fingerprint is None:
+        import hashlib
+
+        rule_set = repr((
+            supported_root_level_fields,
+            supported_task_fields_base,
+            supported_task_fields_v1,
+            supported_task_fields_v2,
+            supported_argument_fields,
+            custom_executors,
+            old_to_new_executors_map,
+            biolib_machine_type_to_resource_requirements,
+            stdout_render_types,
+            render_types,
+            AllowedYAMLEnvironments.values(),
+            ModuleGpuPreference.values(),
+        ))
+        fingerprint = hashlib.sha256(rule_set.encode('utf-8'))
+        # The validation logic itself is part of the rule set as well
+        with open(os.path.abspath(__file__), 'rb') as f:
+            fingerprint.update(f.read())
+        _rule_set_fingerprint = fingerprint.hexdigest()
+    return _rule_set_fingerprint
+
+_rule_set_fingerprint = None
+
+class ResultCache:
+    """Persistent SQLite cache of validation results keyed by config content and rule set.
+
+    Only results that depend solely on the config content (valid and invalid) are stored,
+    along with the errors of single modules stored by SubtreeMemo. Entries of either kind are
+    evicted least recently used first once max_entries of that kind is exceeded, down to
+    nine tenths of max_entries. The object is cheap to pickle so it can be handed to worker
+    processes, each of which opens its own connection lazily.
+    """
+    _connections = {}
+    _connections_lock = None
+    _entry_counts_lock = None
+    _value_columns = {'results': 'result', 'subtree_errors': 'errors'}
+
+    def __init__(self, path: str, max_entries: int = 10000):
+        self.path = path
+        self.max_entries = max_entries
+        self.subtree_memo = SubtreeMemo(self)
+        # Number of entries of each table, counted once and then kept up to date by _insert
+        self._entry_counts = {}
+
+    def __getstate__(self):
+        return {'path': self.path, 'max_entries': self.max_entries}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'], state['max_entries'])
+
+    def _get_connection(self):
+        import sqlite3
+        import threading
+
+        if ResultCache._connections_lock is None:
+            ResultCache._connections_lock = threading.Lock()
+            ResultCache._entry_counts_lock = threading.Lock()
+
+        key = (os.getpid(), threading.get_ident(), self.path)
+        with ResultCache._connections_lock:
+            connection = ResultCache._connections.get(key)
+            if connection is None:
+                connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+                connection.execute('PRAGMA journal_mode=WAL')
+                connection.execute('PRAGMA synchronous=NORMAL')
+                connection.execute(
+                    'CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, result TEXT, last_used REAL)'
+                )
+                connection.execute('CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)')
+                connection.execute(
+                    'CREATE TABLE IF NOT EXISTS subtree_errors (key TEXT PRIMARY KEY, errors TEXT, last_used REAL)'
+                )
+                connection.execute(
+                    'CREATE INDEX IF NOT EXISTS subtree_errors_last_used ON subtree_errors (last_used)'
+                )
+                connection.execute('CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER)')
+                connection.execute("INSERT OR IGNORE INTO stats VALUES ('hits', 0), ('misses', 0)")
+                ResultCache._connections[key] = connection
+        return connection
+
+    @staticmethod
+    def get_key(content: Any, options: Optional[ValidationOptions] = None) -> str:
+        """Return the cache key for the given config content and validation options."""
+        import hashlib
+
+        content_bytes = content.encode('utf-8') if isinstance(content, str) else bytes(content)
+        key = hashlib.sha256(get_rule_set_fingerprint().encode('utf-8'))
+        key.update((options or ValidationOptions()).get_fingerprint().encode('utf-8'))
+        key.update(content_bytes)
+        return key.hexdigest()
+
+    def get(self, key: str, config_file: str) -> Optional[ValidationResult]:
+        """Return the cached result for the key, or None on a miss."""
+        import json
+        import time
+
+        connection = self._get_connection()
+        row = connection.execute('SELECT result FROM results WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            connection.execute("UPDATE stats SET value = value + 1 WHERE name = 'misses'")
+            return None
+
+        connection.execute("UPDATE stats SET value = value + 1 WHERE name = 'hits'")
+        connection.execute('UPDATE results SET last_used = ? WHERE key = ?', (time.time(), key))
+        result = ValidationResult.from_dict(json.loads(row[0]))
+        result.config_file = config_file
+        result.cached = True
+        return result
+
+    def put(self, key: str, result: ValidationResult) -> None:
+        """Store a result, evicting the least recently used entries if the cache is full."""
+        import json
+
+        if result.status not in (ValidationResult.VALID, ValidationResult.INVALID):
+            return
+
+        self._insert('results', key, json.dumps(result.to_dict(), default=str))
+
+    def evict(self) -> None:
+        """Remove the least recently used entries exceeding max_entries."""
+        self._get_connection()
+        with ResultCache._entry_counts_lock:
+            for table in self._value_columns:
+                self._entry_counts.pop(table, None)
+                self._evict_table(table)
+
+    def _insert(self, table: str, key: str, value: str) -> None:
+        import time
+
+        connection = self._get_connection()
+        now = time.time()
+        if connection.execute(f'INSERT OR IGNORE INTO {table} VALUES (?, ?, ?)', (key, value, now)).rowcount:
+            with ResultCache._entry_counts_lock:
+                if table in self._entry_counts:
+                    self._entry_counts[table] += 1
+                self._evict_table(table)
+        else:
+            connection.execute(
+                f'UPDATE {table} SET {self._value_columns[table]} = ?, last_used = ? WHERE key = ?', (value, now, key)
+            )
+
+    def _evict_table(self, table: str) -> None:
+        # Only the first call counts the rows, a full scan. Evicting down to nine tenths of
+        # max_entries keeps later deletes rare, and the count is exact again after each of them.
+        # Entries added by other processes are only seen by this count once it is reloaded.
+        connection = self._get_connection()
+        count = self._entry_counts.get(table)
+        if count is None:
+            count = connection.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+        if count > self.max_entries:
+            remaining = self.max_entries - self.max_entries // 10
+            deleted = connection.execute(
+                f'DELETE FROM {table} WHERE key IN (SELECT key FROM {table} ORDER BY last_used DESC LIMIT -1 OFFSET ?)',
+                (remaining,),
+            ).rowcount
+            # Without any row deleted, other processes evicted the table in the meantime
+            count = remaining if deleted else connection.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+        self._entry_counts[table] = count
+
+    def get_subtree_errors(self, key: str) -> Optional[Any]:
+        """Return the errors stored for a subtree key, or None on a miss."""
+        import json
+        import time
+
+        connection = self._get_connection()
+        row = connection.execute('SELECT errors FROM subtree_errors WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+
+        connection.execute('UPDATE subtree_errors SET last_used = ? WHERE key = ?', (time.time(), key))
+        return self.decode_errors(json.loads(row[0]))
+
+    def put_subtree_errors(self, key: str, errors: Any) -> None:
+        """Store the errors of a subtree, unless they hold values JSON can not represent exactly."""
+        import json
+
+        try:
+            data = self.encode_errors(errors)
+        except TypeError:
+            return
+
+        self._insert('subtree_errors', key, json.dumps(data))
+
+    @classmethod
+    def encode_errors(cls, errors: Any) -> Any:
+        """Return errors as JSON data that decode_errors turns back into equal errors.
+
+        Raises TypeError if they hold keys or ErrorRecord paths and params that would not
+        survive the round trip, e.g. tuples or dates.
+        """
+        if isinstance(errors, dict):
+            return {'items': [[cls._check_exact(key), cls.encode_errors(value)] for key, value in errors.items()]}
+        if isinstance(errors, list):
+            return [cls.encode_errors(item) for item in errors]
+        if isinstance(errors, ErrorRecord):
+            return {
+                'code': errors.code,
+                'path': [cls._check_exact(item) for item in errors.path],
+                'params': [cls._check_exact(param) for param in errors.params],
+            }
+        return cls._check_exact(errors)
+
+    @classmethod
+    def decode_errors(cls, data: Any) -> Any:
+        if isinstance(data, dict):
+            if 'items' in data:
+                return {key: cls.decode_errors(value) for key, value in data['items']}
+            return ErrorRecord(data['code'], tuple(data['path']), *data['params'])
+        if isinstance(data, list):
+            return [cls.decode_errors(item) for item in data]
+        return data
+
+    @classmethod
+    def _check_exact(cls, value: Any) -> Any:
+        if value is None or type(value) in (str, int, float, bool):
+            return value
+        if type(value) is list:
+            for item in value:
+                cls._check_exact(item)
+            return value
+        raise TypeError(f"{type(value).__name__} is not stored exactly as JSON")
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return the number of entries and the lifetime hit and miss counters."""
+        connection = self._get_connection()
+        stats = dict(connection.execute('SELECT name, value FROM stats').fetchall())
+        stats['entries'] = connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+        return stats
+
+class SubtreeMemo:
+    """Memo of the errors of single modules, keyed by a structural hash of the module and the rule set.
+
+    Only modules that changed are validated, whether the others repeat within a config, across
+    the configs of a batch or, with a ResultCache as store, across runs. Each ResultCache holds
+    the memo of its store in subtree_memo, entries are kept in an LRU and written through to the
+    store. The module name is not part of the key, the errors are stored with
+    module_name_placeholder in its place and the name is filled in on each use, so modules with
+    the same content share an entry whatever their name. Arguments are not memoized, hashing one
+    takes longer than validating it. Modules checked against an AppFileIndex depend on the app
+    directory and are always validated.
+    """
+    _max_entries = 4096
+    # Never a valid module name, so it only stands for the name in the stored errors
+    module_name_placeholder = '\0module'
+    _scalar_tags = {int: 'i', float: 'f', bool: 'B', type(None): 'N', bytes: 'b'}
+    _container_tags = {dict: 'd', list: 'l', tuple: 't', set: 'e'}
+
+    def __init__(self, store: Optional[ResultCache] = None):
+        self.store = store
+        self._entries = collections.OrderedDict()
+        self._key_prefix = None
+
+    def get_key(self, kind: str, *values: Any) -> Optional[str]:
+        """Return the key of a subtree, or None if it holds values that can not be hashed structurally.
+
+        The values are walked once, a node reached again through a YAML alias is hashed as a
+        reference to its first occurrence, so the cost is linear in the size of the document
+        rather than in the size of the expanded data.
+        """
+        import datetime
+        import hashlib
+
+        parts = [kind, ':']
+        seen = {}
+        stack = [values]
+        while stack:
+            value = stack.pop()
+            value_type = type(value)
+            if value_type is str:
+                if len(value) > 64:
+                    index = seen.get(id(value))
+                    if index is not None:
+                        parts.append(f"r{index};")
+                        continue
+                    seen[id(value)] = len(seen)
+                parts.append(f"s{len(value)}:")
+                parts.append(value)
+            elif value_type in self._container_tags:
+                index = seen.get(id(value))
+                if index is not None:
+                    parts.append(f"r{index};")
+                    continue
+                seen[id(value)] = len(seen)
+                parts.append(f"{self._container_tags[value_type]}{len(value)}:")
+                if value_type is dict:
+                    for item in reversed(value.items()):
+                        stack.extend(item[::-1])
+                else:
+                    stack.extend(reversed(list(value) if value_type is set else value))
+            elif value_type in self._scalar_tags:
+                parts.append(f"{self._scalar_tags[value_type]}{value!r};")
+            elif value_type in (datetime.date, datetime.datetime):
+                parts.append(f"D{value!r};")
+            else:
+                return None
+
+        if self._key_prefix is None:
+            self._key_prefix = get_rule_set_fingerprint().encode('utf-8') if self.store is not None else b''
+        key = hashlib.blake2b(self._key_prefix, digest_size=16)
+        key.update(''.join(parts).encode('utf-8', 'surrogatepass'))
+        return key.hexdigest()
+
+    def validate_task(
+            self,
+            name: str,
+            task_data: Any,
+            yaml_version: int,
+            file_index: Optional[AppFileIndex] = None,
+    ) -> Dict[str, Any]:
+        """Return the errors of validate_task, reusing them if a module with the same content was validated before."""
+        if file_index is not None:
+            return validate_task(name=name, task_data=task_data, yaml_version=yaml_version, file_index=file_index)
+        error_dict = {}
+        if not validate_name(name, error_dict):
+            return error_dict
+
+        key = self.get_key('module', yaml_version, task_data)
+        if key is None:
+            return validate_task_fields(name, task_data, yaml_version)
+
+        errors = self._get(key)
+        if errors is None:
+            errors = validate_task_fields(self.module_name_placeholder, task_data, yaml_version)
+            self._add(key, errors)
+            if self.store is not None:
+                self.store.put_subtree_errors(key, errors)
+        return self.replace_module_name(errors, name)
+
+    @classmethod
+    def replace_module_name(cls, errors: Any, name: str) -> Any:
+        """Return the errors with each occurrence of module_name_placeholder replaced by name."""
+        if isinstance(errors, dict):
+            return {cls.replace_module_name(key, name): cls.replace_module_name(value, name) for key, value in errors.items()}
+        if isinstance(errors, list):
+            return [cls.replace_module_name(item, name) for item in errors]
+        if isinstance(errors, ErrorRecord):
+            return ErrorRecord(
+                errors.code,
+                tuple(cls.replace_module_name(part, name) for part in errors.path),
+                *(cls.replace_module_name(param, name) for param in errors.params),
+            )
+        return name if errors == cls.module_name_placeholder else errors
+
+    def _get(self, key: str) -> Optional[Any]:
+        try:
+            errors = self._entries[key]
+            self._entries.move_to_end(key)
+            return errors
+        except KeyError:
+            # Not memoized, or evicted by another thread
+            pass
+
+        if self.store is None:
+            return None
+        errors = self.store.get_subtree_errors(key)
+        if errors is not None:
+            self._add(key, errors)
+        return errors
+
+    def _add(self, key: str, errors: Any) -> None:
+        entries = self._entries
+        entries[key] = errors
+        while len(entries) > self._max_entries:
+            try:
+                entries.popitem(last=False)
+            except KeyError:
+                # Evicted by another thread
+                break
+
+def validate_config_file(
+        config_file: str,
+        cache: Optional[ResultCache] = None,
+        options: Optional[ValidationOptions] = None,
+) -> ValidationResult:
+    """Validate a single config.yml file and return the result."""
+    start = time.perf_counter()
+    if not os.path.exists(config_file):
+        return ValidationResult(config_file, ValidationResult.ERROR, message=f"File '{config_file}' does not exist.")
+
+    try:
+        # Check the size before reading the file into memory
+        if options is not None and options.limits is not None:
+            check_input_size(os.path.getsize(config_file), options.limits)
+        if options is not None and options.stream and (cache is None or options.check_files or options.estimate_upload):
+            # Without a cache key to compute, streamed files are parsed from disk instead of from
+            # a copy of their content in memory
+            with open(config_file, 'r') as f:
+                result = _validate_config_content(
+                    f, config_file, options, cache.subtree_memo if cache is not None else None
+                )
+            result.duration = time.perf_counter() - start
+            return result
+        with open(config_file, 'r') as f:
+            content = f.read()
+    except LoaderLimitError as e:
+        result = get_loader_limit_result(config_file, e)
+        result.duration = time.perf_counter() - start
+        return result
+    except Exception as e:
+        return ValidationResult(config_file, ValidationResult.ERROR, message=f"{e}")
+
+    result = validate_config_content(content, config_file, cache=cache, options=options)
+    result.duration = time.perf_counter() - start
+    return result
+
+def check_input_size(size: int, limits: LoaderLimits) -> None:
+    """Raise LoaderLimitError if a document of size bytes is too large to parse."""
+    if size > limits.max_bytes:
+        raise LoaderLimitError(f"Document is {size} bytes, more than the limit of {limits.max_bytes} bytes.")
+
+def validate_config_content(
+        content: Any,
+        config_file: str,
+        cache: Optional[ResultCache] = None,
+        options: Optional[ValidationOptions] = None,
+) -> ValidationResult:
+    """Validate the contents of a config.yml file given as a string or bytes.
+
+    With a cache, modules validated before by this process or by an earlier run using the same
+    cache are not validated again, see SubtreeMemo.
+    """
+    start = time.perf_counter()
+    options = options or ValidationOptions()
+    memo = cache.subtree_memo if cache is not None else None
+    if cache is None or options.check_files or options.estimate_upload:
+        result = _validate_config_content(content, config_file, options, memo)
+    else:
+        key = ResultCache.get_key(content, options)
+        result = cache.get(key, config_file)
+        if result is None:
+            result = _validate_config_content(content, config_file, options, memo)
+            cache.put(key, result)
+
+    result.duration = time.perf_counter() - start
+    return result
+
+def _validate_config_content(
+        content: Any,
+        config_file: str,
+        options: ValidationOptions,
+        memo: Optional[SubtreeMemo] = None,
+) -> ValidationResult:
+    upload_estimator = None
+    if options.estimate_upload:
+        app_directory = get_app_directory(config_file)
+        if app_directory is not None:
+            upload_estimator = UploadSetEstimator(app_directory, max_bytes=options.max_upload_bytes)
+
+    result = _validate_config_content_with(content, config_file, options, upload_estimator, memo)
+    if upload_estimator is not None:
+        result.upload = upload_estimator.get_summary()
+    return result
+
+def _validate_config_content_with(
+        content: Any,
+        config_file: str,
+        options: ValidationOptions,
+        upload_estimator: Optional[UploadSetEstimator],
+        memo: Optional[SubtreeMemo] = None,
+) -> ValidationResult:
+    import io
+
+    yaml = import_yaml()
+
+    if isinstance(content, (str, bytes)):
+        # Wrap the content in a named stream so YAML errors point at the config file
+        stream = io.BytesIO(content) if isinstance(content, bytes) else io.StringIO(content)
+        stream.name = config_file
+    else:
+        stream = content
+    yaml_data, root_node, yaml_version = None, None, None
+    streaming_validator = None
+    try:
+        if options.limits is not None and stream is not content:
+            check_input_size(len(content), options.limits)
+
+        file_index = get_app_file_index(config_file) if options.check_files else None
+
+        if options.stream:
+            streaming_validator = StreamingValidator(
+                max_errors=options.max_errors,
+                limits=options.limits,
+                file_index=file_index,
+                upload_estimator=upload_estimator,
+                memo=memo,
+            )
+            yaml_version = streaming_validator.validate(stream)
+            if yaml_version is None:
+                return ValidationResult(config_file, ValidationResult.ERROR, message="Empty YAML file.")
+            return ValidationResult(config_file, ValidationResult.VALID, version=yaml_version)
+
+        yaml_data, root_node = load_yaml(stream, limits=options.limits)
+
+        if yaml_data is None:
+            return ValidationResult(config_file, ValidationResult.ERROR, message="Empty YAML file.")
+
+        yaml_version = validate_and_get_biolib_yaml_version(yaml_data)
+
+        validate_yaml_config(
+            yaml_data,
+            yaml_version,
+            max_errors=options.max_errors,
+            file_index=file_index,
+            upload_estimator=upload_estimator,
+            memo=memo,
+        )
+
+        return ValidationResult(config_file, ValidationResult.VALID, version=yaml_version)
+
+    except yaml.YAMLError as e:
+        message = f"Malformed YAML: {e}"
+        locations = []
+        problem_mark = getattr(e, 'problem_mark', None)
+        if problem_mark is not None:
+            locations.append({'path': [], 'message': message, 'line': problem_mark.line + 1, 'column': problem_mark.column + 1})
+        return ValidationResult(config_file, ValidationResult.ERROR, message=message, locations=locations)
+    except LoaderLimitError as e:
+        return get_loader_limit_result(config_file, e)
+    except ValidationError as e:
+        if streaming_validator is not None:
+            yaml_version = streaming_validator.version
+            marks, argument_indexes = streaming_validator.marks, streaming_validator.argument_indexes
+        else:
+            marks, argument_indexes = get_node_marks(root_node), get_argument_indexes(yaml_data)
+        detail = add_suggestions(e.detail) if options.suggest else e.detail
+        return ValidationResult(
+            config_file,
+            ValidationResult.INVALID,
+            detail=detail,
+            locations=get_error_locations(detail, marks, argument_indexes),
+            version=yaml_version,
+        )
+    except Exception as e:
+        return ValidationResult(config_file, ValidationResult.ERROR, message=f"{e}")
+
+def validate_source(
+        source: Any,
+        cache: Optional[ResultCache] = None,
+        options: Optional[ValidationOptions] = None,
+) -> ValidationResult:
+    """Validate a source, which is either a path or a (name, content) tuple.
+
+    Adapters yield a ValidationResult instead for inputs they could not read, it is passed through.
+    """
+    if isinstance(source, ValidationResult):
+        return source
+    if isinstance(source, tuple):
+        name, content = source
+        return validate_config_content(content, name, cache=cache, options=options)
+    return validate_config_file(os.fspath(source), cache=cache, options=options)
+
+def validate_sources(
+        sources: List[Any],
+        cache: Optional[ResultCache] = None,
+        options: Optional[ValidationOptions] = None,
+) -> List[ValidationResult]:
+    """Validate a chunk of sources, used as the unit of work in the process pool."""
+    return [validate_source(source, cache=cache, options=options) for source in sources]
+
+def iter_validation_results(
+        sources: Iterable[Any],
+        jobs: int = 1,
+        chunk_size: int = 16,
+        cache: Optional[ResultCache] = None,
+        options: Optional[ValidationOptions] = None,
+) -> Iterator[ValidationResult]:
+    """Validate sources (see validate_source), optionally across a process pool, yielding results in input order."""
+    if jobs == 1:
+        for source in sources:
+            yield validate_source(source, cache=cache, options=options)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Keep a bounded window of chunks in flight so arbitrarily long inputs (e.g. stdin) are
+    # consumed lazily and results are reported while later files are still being validated
+    max_pending_chunks = jobs * 4
+    # Workers inherit the instrumented functions when forked, the initializer covers other start methods
+    initializer = enable_profiling if _profiler is not None else None
+    with ProcessPoolExecutor(max_workers=jobs, initializer=initializer) as executor:
+        pending = collections.deque()
+        chunk = []
+        for source in sources:
+            chunk.append(source)
+            if len(chunk) < chunk_size:
+                continue
+            pending.append(executor.submit(validate_sources, chunk, cache, options))
+            chunk = []
+            if len(pending) >= max_pending_chunks:
+                yield from pending.popleft().result()
+
+        if chunk:
+            pending.append(executor.submit(validate_sources, chunk, cache, options))
+        while pending:
+            yield from pending.popleft().result()
+
+# Library API. These functions never print or exit and are safe to call from multiple
+# threads, the validators only work on their arguments and local state.
+
+def validate_bytes(
+        data: Any,
+        name: str = '<bytes>',
+        cache: Optional[ResultCache] = None,
+        options: Optional[ValidationOptions] = None,
+) -> ValidationResult:
+    """Validate config.yml content given as bytes or str."""
+    return validate_config_content(data, name, cache=cache, options=options)
+
+def validate_path(
+        path: Any,
+        cache: Optional[ResultCache] = None,
+        options: Optional[ValidationOptions] = None,
+) -> ValidationResult:
+    """Validate the config.yml file at path."""
+    return validate_config_file(os.fspath(path), cache=cache, options=options)
+
+def validate_many(
+        sources: Iterable[Any],
+        jobs: int = 1,
+        cache: Optional[ResultCache] = None,
+        options: Optional[ValidationOptions] = None,
+) -> Iterator[ValidationResult]:
+    """Validate paths and/or (name, content) tuples, yielding results in input order.
+
+    With jobs > 1 the sources are validated across a pool of worker processes.
+    """
+    return iter_validation_results(sources, jobs=jobs, cache=cache, options=options)
+
+def is_glob_pattern(pattern: str) -> bool:
+    """Check whether a config file argument should be expanded as a glob pattern."""
+    return any(char in pattern for char in '*?[')
+
+def iter_config_files(patterns: List[str]) -> Iterator[str]:
+    """Expand config file arguments: plain paths, glob patterns and "-" for paths on stdin."""
+    import glob
+
+    for pattern in patterns:
+        if pattern == '-':
+            for line in sys.stdin:
+                line = line.strip()
+                if line:
+                    yield line
+        elif is_glob_pattern(pattern):
+            matches = sorted(glob.iglob(pattern, recursive=True))
+            if not matches:
+                print(f"Warning: Pattern '{pattern}' did not match any files.", file=sys.stderr)
+            yield from matches
+        else:
+            yield pattern
+
+def is_archive_config_member(name: str) -> bool:
+    """Check whether an archive member is an app config, .biolib/config.yml in any directory."""
+    if name.startswith('./'):
+        name = name[2:]
+    return name == '.biolib/config.yml' or name.endswith('/.biolib/config.yml')
+
+def iter_archive_sources(archive: str, limits: Optional[LoaderLimits] = None) -> Iterator[Any]:
+    """Yield the app configs in a tar or zip archive as (name, content) sources, see validate_source.
+
+    archive is a path or "-" for stdin and members are named "<archive>:<member>". Tar archives,
+    compressed or not, are streamed member by member without extracting them, zip archives are
+    read through their central directory, from memory when read from stdin. With limits,
+    members larger than limits.max_bytes are not read. They and archives that can not be read
+    are yielded as results instead.
+    """
+    import tarfile
+    import zipfile
+
+    archive_name = '<stdin>' if archive == '-' else archive
+    found = False
+    try:
+        if archive == '-':
+            stream = sys.stdin.buffer
+            is_zip = stream.peek(4)[:4] == b'PK\x03\x04'
+            if is_zip:
+                import io
+
+                stream = io.BytesIO(stream.read())
+        else:
+            is_zip = zipfile.is_zipfile(archive)
+            stream = archive if is_zip else open(archive, 'rb')
+
+        if is_zip:
+            with zipfile.ZipFile(stream) as zip_file:
+                for info in zip_file.infolist():
+                    if info.is_dir() or not is_archive_config_member(info.filename):
+                        continue
+                    found = True
+                    yield get_archive_member_source(
+                        f'{archive_name}:{info.filename}', info.file_size, lambda: zip_file.read(info), limits
+                    )
+        else:
+            # Stream mode reads each member once, in order, without seeking back
+            with stream, tarfile.open(fileobj=open_decompressed_stream(stream), mode='r|') as tar_file:
+                for member in tar_file:
+                    if not member.isfile() or not is_archive_config_member(member.name):
+                        continue
+                    found = True
+                    yield get_archive_member_source(
+                        f'{archive_name}:{member.name}', member.size, tar_file.extractfile(member).read, limits
+                    )
+    except Exception as e:
+        yield ValidationResult(archive_name, ValidationResult.ERROR, message=f"Could not read archive: {e}")
+        return
+
+    if not found:
+        print(f"Warning: Archive '{archive_name}' does not contain any .biolib/config.yml files.", file=sys.stderr)
+
+# Magic bytes of the compression formats of tar archives and the modules reading them
+compression_magic_modules = [
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'lzma'),
+]
+
+def open_decompressed_stream(stream: Any) -> Any:
+    """Return a reader decompressing a gzip, bzip2 or xz stream, or the stream itself if it is not compressed.
+
+    The decompressing readers of these modules buffer in C, which is several times faster than
+    the decompression of tarfile's own "r|*" stream mode.
+    """
+    import importlib
+
+    magic = stream.peek(6)[:6]
+    for prefix, module_name in compression_magic_modules:
+        if magic.startswith(prefix):
+            module = importlib.import_module(module_name)
+            return module.open(stream, 'rb')
+    return stream
+
+def get_archive_member_source(
+        name: str,
+        size: int,
+        read: Callable[[], bytes],
+        limits: Optional[LoaderLimits],
+) -> Any:
+    """Return the (name, content) source of an archive member, or its result if it is over the size limit."""
+    try:
+        # Check the size before reading the member into memory
+        if limits is not None:
+            check_input_size(size, limits)
+    except LoaderLimitError as e:
+        return get_loader_limit_result(name, e)
+    return name, read()
+
+def is_yaml_document_marker(line: bytes, marker: bytes) -> bool:
+    return line.startswith(marker) and (len(line) == 3 or line[3:4].isspace())
+
+def iter_yaml_document_sources(stream: Any, name: str = '<stdin>') -> Iterator[Tuple[str, bytes]]:
+    """Yield each document of a multi-document YAML stream as a (name, content) source, see validate_source.
+
+    The stream is split at the "---" and "..." markers at the start of a line, which always
+    separate documents in YAML, and read line by line, so one document is held in memory at a
+    time. Documents are named "<name>:<number>", counting from 1, and positions in their errors
+    are relative to the document. Documents without any content are skipped.
+    """
+    number = 0
+    lines = []
+    has_content = False
+    has_start_marker = False
+    for line in stream:
+        if is_yaml_document_marker(line, b'---') and (has_content or has_start_marker):
+            if has_content:
+                number += 1
+                yield f'{name}:{number}', b''.join(lines)
+            lines, has_content = [], False
+        lines.append(line)
+
+        if is_yaml_document_marker(line, b'---'):
+            has_start_marker = True
+            line = line[3:]
+        elif is_yaml_document_marker(line, b'...'):
+            # Directives after the end marker belong to the next document
+            if has_content:
+                number += 1
+                yield f'{name}:{number}', b''.join(lines)
+            lines, has_content, has_start_marker = [], False, False
+            continue
+        stripped = line.strip()
+        if stripped and not stripped.startswith((b'#', b'%')):
+            has_content = True
+
+    if has_content:
+        number += 1
+        yield f'{name}:{number}', b''.join(lines)
+
+# Directories never containing app configs, skipped without listing them
+pruned_directory_names = frozenset([
+    '.git',
+    '.hg',
+    '.svn',
+    'node_modules',
+    '__pycache__',
+    '.venv',
+    'venv',
+    '.tox',
+    '.nox',
+    '.mypy_cache',
+    '.pytest_cache',
+])
+
+def compile_glob_patterns(patterns: List[str]) -> Optional[Any]:
+    """Compile glob patterns into one regular expression, or None if there are none."""
+    if not patterns:
+        return None
+    import fnmatch
+
+    return re.compile('|'.join(f'(?:{fnmatch.translate(pattern)})' for pattern in patterns))
+
+def scan_config_directory(path: str, exclude_pattern: Optional[Any], root: str) -> Tuple[List[str], List[str]]:
+    """List a directory for discovery, returning the subdirectories to descend into and the configs found."""
+    directories = []
+    config_files = []
+    try:
+        with os.scandir(path) as entries:
+            entries = sorted(entries, key=lambda entry: entry.name)
+    except OSError:
+        return directories, config_files
+
+    for entry in entries:
+        if entry.name == 'pyvenv.cfg':
+            # Virtualenvs can have any name, they are recognized by their marker file
+            return [], config_files
+    for entry in entries:
+        try:
+            if not entry.is_dir(follow_symlinks=False):
+                continue
+        except OSError:
+            continue
+        if entry.name in pruned_directory_names:
+            continue
+        if exclude_pattern is not None:
+            relative_path = os.path.relpath(entry.path, root)
+            if exclude_pattern.match(entry.name) or exclude_pattern.match(relative_path):
+                continue
+        if entry.name == '.biolib':
+            config_file = os.path.join(entry.path, 'config.yml')
+            if os.path.isfile(config_file):
+                config_files.append(config_file)
+        else:
+            directories.append(entry.path)
+    return directories, config_files
+
+def iter_discovered_config_files(roots: List[str], excludes: Optional[List[str]] = None, threads: int = 1) -> Iterator[str]:
+    """Find .biolib/config.yml files below roots, yielding each as soon as it is found.
+
+    Directories in pruned_directory_names, virtualenvs and directories matching one of the
+    exclude globs, by name or by path relative to the root, are not traversed. With threads > 1
+    directories are listed concurrently, which helps on network filesystems, and the configs
+    are yielded in the order they are found rather than sorted by path.
+    """
+    exclude_pattern = compile_glob_patterns(excludes or [])
+    if threads <= 1:
+        for root in roots:
+            stack = [root]
+            while stack:
+                directories, config_files = scan_config_directory(stack.pop(), exclude_pattern, root)
+                yield from config_files
+                stack.extend(reversed(directories))
+        return
+
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        pending = {executor.submit(scan_config_directory, root, exclude_pattern, root): root for root in roots}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                root = pending.pop(future)
+                directories, config_files = future.result()
+                for directory in directories:
+                    pending[executor.submit(scan_config_directory, directory, exclude_pattern, root)] = root
+                yield from config_files
+
+class GitError(Exception):
+    pass
+
+def run_git(repository: str, args: List[str], input: Optional[bytes] = None) -> bytes:
+    """Run a git command in repository and return its output, raising GitError if it fails."""
+    import subprocess
+
+    try:
+        process = subprocess.run(['git', '-C', repository] + args, input=input, capture_output=True)
+    except OSError as e:
+        raise GitError(f"Could not run git: {e}")
+    if process.returncode != 0:
+        raise GitError(process.stderr.decode('utf-8', 'replace').strip())
+    return process.stdout
+
+def iter_git_config_blobs(
+        revision_range: str,
+        pathspec: str = '**/.biolib/config.yml',
+        repository: str = '.',
+) -> Iterator[Tuple[str, str, str]]:
+    """Yield (commit, path, blob SHA) for every config file at every commit of a revision range.
+
+    A single git diff-tree --stdin process lists the config files each commit changed relative
+    to its first parent. The commits are walked parents first and the blobs of each commit are
+    those of its first parent with these changes applied, so the cost grows with the number of
+    changes rather than with the number of commits times the number of configs. Commits are
+    yielded newest first.
+    """
+    first_parents = {}
+    for line in run_git(repository, ['rev-list', '--topo-order', '--reverse', '--parents', revision_range]).split(b'\n'):
+        if line:
+            commit, *parents = line.decode().split()
+            first_parents[commit] = parents[0] if parents else None
+    if not first_parents:
+        return
+
+    diff_args = ['-r', '--raw', '-z', '--no-abbrev', '--no-renames', '--', f':(glob){pathspec}']
+    commit_lines = (f'{commit} {parent}' if parent else commit for commit, parent in first_parents.items())
+    changes = collections.defaultdict(list)
+    for commit, path, sha in iter_git_raw_changes(run_git(
+            repository, ['diff-tree', '--stdin', '--root'] + diff_args, input='\n'.join(commit_lines).encode() + b'\n'
+    )):
+        changes[commit].append((path, sha))
+
+    blobs = {}
+    for commit, parent in first_parents.items():
+        if parent is None:
+            commit_blobs = {}
+        elif parent in blobs:
+            commit_blobs = blobs[parent]
+        else:
+            # The first parent is outside the range, list its config files by diffing it against the empty tree
+            empty_tree = run_git(repository, ['hash-object', '-t', 'tree', '--stdin'], input=b'').decode().strip()
+            output = run_git(repository, ['diff-tree', empty_tree, parent] + diff_args)
+            commit_blobs = {path: sha for _, path, sha in iter_git_raw_changes(output)}
+        if commit in changes:
+            # Copied on write, unchanged commits share the blobs of their first parent
+            commit_blobs = dict(commit_blobs)
+            for path, sha in changes[commit]:
+                if sha is None:
+                    commit_blobs.pop(path, None)
+                else:
+                    commit_blobs[path] = sha
+        blobs[commit] = commit_blobs
+
+    for commit in reversed(list(first_parents)):
+        for path, sha in sorted(blobs[commit].items()):
+            yield commit, path, sha
+
+def iter_git_raw_changes(output: bytes) -> Iterator[Tuple[Optional[str], str, Optional[str]]]:
+    """Parse the output of git diff-tree -r --raw -z into (commit, path, blob SHA) changes.
+
+    commit is the last commit header seen, None without --stdin. The SHA is None for files that
+    were deleted or replaced by something else than a blob, like a submodule.
+    """
+    fields = output.split(b'\0')
+    commit = None
+    index = 0
+    while index < len(fields):
+        field = fields[index].decode('utf-8', 'surrogateescape')
+        index += 1
+        if not field.startswith(':'):
+            if field:
+                commit = field
+            continue
+        _, new_mode, _, new_sha, _ = field[1:].split(' ')
+        path = fields[index].decode('utf-8', 'surrogateescape')
+        index += 1
+        is_blob = new_mode.startswith(('100', '120'))
+        yield commit, path, new_sha if is_blob else None
+
+class GitBlobReader:
+    """Reads blobs through a single long lived git cat-file --batch process."""
+
+    def __init__(self, repository: str = '.'):
+        import subprocess
+
+        try:
+            self.process = subprocess.Popen(
+                ['git', '-C', repository, 'cat-file', '--batch'],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+            )
+        except OSError as e:
+            raise GitError(f"Could not run git: {e}")
+
+    def read(self, sha: str) -> bytes:
+        self.process.stdin.write(sha.encode() + b'\n')
+        self.process.stdin.flush()
+        header = self.process.stdout.readline().split()
+        if len(header) != 3:
+            raise GitError(f"Could not read blob {sha}")
+        content = self.process.stdout.read(int(header[2]))
+        self.process.stdout.read(1)  # Trailing newline
+        return content
+
+    def close(self) -> None:
+        self.process.stdin.close()
+        self.process.wait()
+        self.process.stdout.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def validate_git_range(
+        revision_range: str,
+        pathspec: str = '**/.biolib/config.yml',
+        repository: str = '.',
+        jobs: int = 1,
+        cache: Optional[ResultCache] = None,
+        options: Optional[ValidationOptions] = None,
+) -> Iterator[ValidationResult]:
+    """Validate the config files at every commit of a revision range, yielding a result per commit and path.
+
+    Each distinct blob is read and validated once and its result is reported for every commit
+    and path referring to it, named "<commit>:<path>". Messages embedding the file name, like
+    malformed YAML errors, name the first commit and path the blob was found at.
+    """
+    import copy
+
+    references = list(iter_git_config_blobs(revision_range, pathspec=pathspec, repository=repository))
+    first_references = {}
+    for commit, path, sha in references:
+        first_references.setdefault(sha, f'{commit[:12]}:{path}')
+
+    results = {}
+    with GitBlobReader(repository) as reader:
+        # The blobs are read lazily while earlier ones are validated
+        sources = ((name, reader.read(sha)) for sha, name in first_references.items())
+        for sha, result in zip(first_references, iter_validation_results(sources, jobs=jobs, cache=cache, options=options)):
+            results[sha] = result
+
+    for commit, path, sha in references:
+        result = results[sha]
+        if result.config_file != f'{commit[:12]}:{path}':
+            result = copy.copy(result)
+            result.config_file = f'{commit[:12]}:{path}'
+            # The blob was only validated and profiled once
+            result.profile = None
+        yield result
+
+def print_validation_result(result: ValidationResult, file: Optional[TextIO] = None, positions: bool = False) -> None:
+    """Print the result of validating a single config file.
+
+    With positions each error is printed as "path:line:column: message", a format most CI
+    systems can turn into inline annotations.
+    """
+    if positions and result.locations:
+        for location in result.locations:
+            print(f"{result.config_file}:{location['line'] or 1}:{location['column'] or 1}: {location['message']}", file=file)
+    elif result.status == ValidationResult.VALID:
+        print(f"Validation successful: '{result.config_file}' is valid.", file=file)
+    elif result.status == ValidationResult.INVALID:
+        print_validation_errors(ValidationError(result.detail), file=file)
+    else:
+        print(f"Error: {result.message}", file=file)
+    if result.upload is not None:
+        print(
+            f"Upload set of '{result.config_file}': {result.upload['files']} files, "
+            f"{format_size(result.upload['bytes'])}.",
+            file=file,
+        )
+
+class TextReporter:
+    """Prints results in the human readable format, with a summary line for batches."""
+
+    def __init__(self, is_batch: bool = False, positions: bool = False, file: Optional[TextIO] = None):
+        self.is_batch = is_batch
+        self.positions = positions
+        self.file = file
+
+    def report(self, result: ValidationResult) -> None:
+        if self.is_batch and result.status != ValidationResult.VALID:
+            print(f"\nValidation failed: '{result.config_file}'", file=self.file)
+        print_validation_result(result, file=self.file, positions=self.positions)
+
+    def finish(self, status_counts: Dict[str, int]) -> None:
+        if not self.is_batch:
+            return
+        total = sum(status_counts.values())
+        print(
+            f"\nChecked {total} files: {status_counts[ValidationResult.VALID]} valid, "
+            f"{status_counts[ValidationResult.INVALID]} invalid, {status_counts[ValidationResult.ERROR]} errors.",
+            file=self.file,
+        )
+
+class NdjsonReporter:
+    """Writes one JSON record per result and flushes it immediately."""
+
+    def __init__(self, file: Optional[TextIO] = None):
+        self.file = file or sys.stdout
+
+    def report(self, result: ValidationResult) -> None:
+        import json
+
+        record = {
+            'path': result.config_file,
+            'status': result.status,
+            'errors': result.detail,
+            'locations': ValidationResult.render_locations(result.locations),
+            'message': result.message,
+            'version': result.version,
+            'cached': result.cached,
+            'duration': result.duration,
+        }
+        if result.upload is not None:
+            record['upload'] = result.upload
+        self.file.write(json.dumps(record, default=str) + '\n')
+        self.file.flush()
+
+    def finish(self, status_counts: Dict[str, int]) -> None:
+        pass
+
+class SarifReporter:
+    """Streams a SARIF 2.1.0 log, writing the results of each file as soon as it is reported.
+
+    Only the surrounding document structure is kept open, so memory use does not grow with
+    the number of files. The rules are the codes of error_message_templates, plus one rule for
+    configs that could not be read or parsed and one for documents exceeding the LoaderLimits.
+    """
+    tool_name = 'biolib-check'
+    extra_rules = {
+        'config.unreadable': 'The config file could not be read or is not valid YAML',
+        'yaml.limit_exceeded': 'The document exceeds a limit for parsing untrusted YAML',
+    }
+
+    def __init__(self, file: Optional[TextIO] = None):
+        import json
+
+        self.file = file or sys.stdout
+        self._has_results = False
+        rules = {**error_message_templates, **self.extra_rules}
+        self.rule_indexes = {rule_id: index for index, rule_id in enumerate(rules)}
+        driver = {
+            'name': self.tool_name,
+            'rules': [{'id': rule_id, 'shortDescription': {'text': text}} for rule_id, text in rules.items()],
+        }
+        self.file.write(
+            '{"version": "2.1.0", '
+            '"$schema": "https://json.schemastore.org/sarif-2.1.0.json", '
+            '"runs": [{"tool": {"driver": ' + json.dumps(driver) + '}, "results": ['
+        )
+
+    @staticmethod
+    def get_rule_id(result: ValidationResult, location: Dict[str, Any]) -> str:
+        # Results read from the cache keep the code next to the rendered message
+        if isinstance(location['message'], ErrorRecord):
+            return location['message'].code
+        if location.get('code'):
+            return location['code']
+        if result.status == ValidationResult.ERROR:
+            return 'config.unreadable'
+        return 'yaml.limit_exceeded'
+
+    def report(self, result: ValidationResult) -> None:
+        import json
+
+        locations = result.locations
+        if result.status == ValidationResult.ERROR and not locations:
+            locations = [{'path': [], 'message': result.message, 'line': None, 'column': None}]
+
+        for location in locations:
+            physical_location = {'artifactLocation': {'uri': result.config_file.replace(os.sep, '/')}}
+            if location['line']:
+                physical_location['region'] = {'startLine': location['line'], 'startColumn': location['column'] or 1}
+            rule_id = self.get_rule_id(result, location)
+            sarif_result = {
+                'ruleId': rule_id,
+                'ruleIndex': self.rule_indexes[rule_id],
+                'level': 'error',
+                'message': {'text': location['message']},
+                'locations': [{'physicalLocation': physical_location}],
+            }
+            self.file.write((', ' if self._has_results else '') + json.dumps(sarif_result, default=str))
+            self._has_results = True
+        self.file.flush()
+
+    def finish(self, status_counts: Dict[str, int]) -> None:
+        self.file.write(']}]}\n')
+        self.file.flush()
+
+def print_cache_stats(cache: ResultCache, cache_hits: int, total: int) -> None:
+    """Print the cache hit rate of this run and the lifetime statistics of the cache."""
+    stats = cache.get_stats()
+    lookups = stats['hits'] + stats['misses']
+    run_hit_rate = cache_hits / total if total else 0.0
+    lifetime_hit_rate = stats['hits'] / lookups if lookups else 0.0
+    print(
+        f"Cache: {cache_hits}/{total} hits this run ({run_hit_rate:.1%}), "
+        f"{stats['hits']}/{lookups} lifetime ({lifetime_hit_rate:.1%}), {stats['entries']} entries",
+        file=sys.stderr,
+    )
+
+def get_result_response(result: ValidationResult) -> Dict[str, Any]:
+    """Return the response sent by the validation servers for a result.
+
+    Holds the fields of ValidationResult.to_dict() plus the text the CLI would print as
+    "output" and the "exit_code" it would exit with.
+    """
+    import io
+
+    output = io.StringIO()
+    print_validation_result(result, file=output)
+    response = result.to_dict()
+    response['output'] = output.getvalue()
+    response['exit_code'] = 0 if result.status == ValidationResult.VALID else 1
+    return response
+
+def serve(socket_path: str, cache: Optional[ResultCache] = None, options: Optional[ValidationOptions] = None) -> None:
+    """Serve validation requests on a Unix socket until interrupted or terminated.
+
+    A stale socket left at socket_path is replaced, any other file raises FileExistsError. The
+    socket is removed again when the server stops.
+
+    The protocol is one JSON object per line in each direction. A request is either
+    {"path": "/abs/path/config.yml"} or {"content": "<yaml>"}, optionally with a "name" used
+    when rendering the result. The response is described in get_result_response.
+    """
+    import json
+    import signal
+    import socketserver
+    import stat
+
+    class ValidationRequestHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                    if 'content' in request:
+                        result = validate_config_content(
+                            request['content'], request.get('name', '<content>'), cache=cache, options=options
+                        )
+                    else:
+                        result = validate_config_file(request['path'], cache=cache, options=options)
+                        result.config_file = request.get('name', result.config_file)
+                except Exception as e:
+                    result = ValidationResult('<request>', ValidationResult.ERROR, message=f"Invalid request: {e}")
+
+                response = get_result_response(result)
+                self.wfile.write(json.dumps(response, default=str).encode('utf-8') + b'\n')
+                self.wfile.flush()
+
+    class ValidationServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    # Only a stale socket from a previous server is replaced, never a regular file
+    try:
+        if not stat.S_ISSOCK(os.lstat(socket_path).st_mode):
+            raise FileExistsError(f"'{socket_path}' exists and is not a socket")
+        os.unlink(socket_path)
+    except FileNotFoundError:
+        pass
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    with ValidationServer(socket_path, ValidationRequestHandler) as server:
+        print(f"Listening on '{socket_path}'", file=sys.stderr)
+        previous_handler = signal.signal(signal.SIGTERM, stop)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            signal.signal(signal.SIGTERM, previous_handler)
+            try:
+                os.unlink(socket_path)
+            except FileNotFoundError:
+                pass
+
+class HttpValidationServer:
+    """Asyncio HTTP server validating configs on a pool of worker processes.
+
+    Endpoints:
+        POST /validate        Body is the config content, ?name= sets the name used in messages.
+                              Responds with get_result_response() of the result.
+        POST /validate/batch  Body is {"configs": [{"name": ..., "content": ...}, ...]}, responds
+                              with {"results": [...]} in the same order.
+        GET  /metrics         Request, latency, queue time and queue depth statistics.
+        GET  /health          Responds with {"status": "ok"}.
+
+    At most max_queue configs are admitted at a time, requests that would exceed it are
+    rejected with 503 so callers can back off. Admitted configs are handed to the workers
+    with at most two per worker in flight. Bodies must be sent with a Content-Length, chunked
+    requests are rejected with 411.
+    """
+    max_body_size = 16 * 1024 * 1024
+
+    def __init__(
+            self,
+            jobs: int = 1,
+            max_queue: int = 256,
+            cache: Optional[ResultCache] = None,
+            options: Optional[ValidationOptions] = None,
+    ):
+        self.jobs = jobs
+        self.max_queue = max_queue
+        self.cache = cache
+        self.options = options
+        self.pending = 0
+        self.request_counts = collections.Counter()
+        self.latencies = collections.deque(maxlen=1000)
+        self.queue_times = collections.deque(maxlen=1000)
+        self._executor = None
+        self._worker_slots = None
+
+    async def run(self, host: str, port: int) -> None:
+        import asyncio
+        from concurrent.futures import ProcessPoolExecutor
+
+        self._worker_slots = asyncio.Semaphore(self.jobs * 2)
+        with ProcessPoolExecutor(max_workers=self.jobs) as self._executor:
+            server = await asyncio.start_server(self._handle_connection, host, port)
+            print(f"Listening on http://{host}:{port}", file=sys.stderr)
+            async with server:
+                await server.serve_forever()
+
+    async def _validate(self, name: str, content: Any) -> ValidationResult:
+        import asyncio
+
+        queued_at = time.perf_counter()
+        async with self._worker_slots:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._executor, validate_source, (name, content), self.cache, self.options)
+        # The time not spent validating in the worker was spent waiting for it
+        self.queue_times.append(max(0.0, time.perf_counter() - queued_at - result.duration))
+        return result
+
+    async def _validate_admitted(self, configs: List[Tuple[str, Any]]) -> Tuple[int, Any]:
+        import asyncio
+
+        if len(configs) > self.max_queue:
+            return 413, {'error': f'Batches can contain at most {self.max_queue} configs'}
+        if self.pending + len(configs) > self.max_queue:
+            return 503, {'error': 'Validation queue is full, retry later'}
+
+        self.pending += len(configs)
+        try:
+            return 200, await asyncio.gather(*(self._validate(name, content) for name, content in configs))
+        finally:
+            self.pending -= len(configs)
+
+    async def _handle_request(self, method: str, target: str, body: bytes) -> Tuple[int, Any]:
+        import json
+        from urllib.parse import parse_qs, urlsplit
+
+        url = urlsplit(target)
+        if method == 'GET' and url.path == '/health':
+            return 200, {'status': 'ok'}
+
+        if method == 'GET' and url.path == '/metrics':
+            return 200, self.get_metrics()
+
+        if method == 'POST' and url.path == '/validate':
+            name = parse_qs(url.query).get('name', ['<request>'])[0]
+            status, results = await self._validate_admitted([(name, body)])
+            return status, get_result_response(results[0]) if status == 200 else results
+
+        if method == 'POST' and url.path == '/validate/batch':
+            try:
+                configs = [(config.get('name', '<request>'), config['content']) for config in json.loads(body)['configs']]
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                return 400, {'error': f'Invalid batch request: {e}'}
+            for index, (name, content) in enumerate(configs):
+                if not isinstance(name, str) or not isinstance(content, str):
+                    return 400, {'error': f'Invalid batch request: the name and content of config {index} must be strings'}
+            status, results = await self._validate_admitted(configs)
+            return status, {'results': [get_result_response(result) for result in results]} if status == 200 else results
+
+        return 404, {'error': f'No endpoint {method} {url.path}'}
+
+    async def _handle_connection(self, reader, writer) -> None:
+        import asyncio
+        import json
+
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                start = time.perf_counter()
+                request_parts = request_line.decode('latin-1').split()
+
+                headers = {}
+                while True:
+                    header_line = await reader.readline()
+                    if header_line in (b'\r\n', b'\n', b''):
+                        break
+                    header_name, _, header_value = header_line.decode('latin-1').partition(':')
+                    headers[header_name.strip().lower()] = header_value.strip()
+
+                # Requests that can not be parsed are answered and the connection closed, the end
+                # of their body is unknown
+                content_length = headers.get('content-length', '0')
+                keep_alive = False
+                if len(request_parts) != 3:
+                    status, response = 400, {'error': 'Malformed request line'}
+                elif headers.get('transfer-encoding', 'identity').lower() != 'identity':
+                    # Chunked bodies are not decoded, the body can not be skipped either
+                    status, response = 411, {'error': 'Request body must be sent with a Content-Length'}
+                elif not (content_length.isascii() and content_length.isdigit()):
+                    status, response = 400, {'error': 'Content-Length must be a non-negative integer'}
+                elif int(content_length) > self.max_body_size:
+                    status, response = 413, {'error': 'Request body too large'}
+                else:
+                    method, target, version = request_parts
+                    body = await reader.readexactly(int(content_length))
+                    keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                    try:
+                        status, response = await self._handle_request(method, target, body)
+                    except Exception as e:
+                        status, response = 500, {'error': f'Internal error: {e}'}
+                        keep_alive = False
+
+                response_body = json.dumps(response, default=str).encode('utf-8')
+                response_lines = [
+                    f"HTTP/1.1 {status} {self._reasons.get(status, 'OK')}",
+                    'Content-Type: application/json',
+                    f'Content-Length: {len(response_body)}',
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}",
+                ]
+                if status == 503:
+                    response_lines.append('Retry-After: 1')
+                writer.write(('\r\n'.join(response_lines) + '\r\n\r\n').encode('latin-1') + response_body)
+                await writer.drain()
+
+                self.request_counts[status] += 1
+                self.latencies.append(time.perf_counter() - start)
+                if not keep_alive:
+                    break
+        except (ValueError, ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    _reasons = {
+        200: 'OK',
+        400: 'Bad Request',
+        404: 'Not Found',
+        411: 'Length Required',
+        413: 'Payload Too Large',
+        500: 'Internal Server Error',
+        503: 'Service Unavailable',
+    }
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return request counts, queue depth and latency and queue time percentiles in milliseconds."""
+        def summarize(samples):
+            if not samples:
+                return {'count': 0}
+            ordered = sorted(samples)
+            return {
+                'count': len(ordered),
+                'mean_ms': sum(ordered) / len(ordered) * 1000,
+                'p50_ms': ordered[len(ordered) // 2] * 1000,
+                'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+                'max_ms': ordered[-1] * 1000,
+            }
+
+        return {
+            'requests': {str(status): count for status, count in self.request_counts.items()},
+            'queue_depth': self.pending,
+            'max_queue': self.max_queue,
+            'workers': self.jobs,
+            'request_latency': summarize(self.latencies),
+            'queue_time': summarize(self.queue_times),
+        }
+
+def serve_http(
+        address: str,
+        jobs: int = 1,
+        max_queue: int = 256,
+        cache: Optional[ResultCache] = None,
+        options: Optional[ValidationOptions] = None,
+) -> None:
+    """Run the HTTP validation server on address ("host:port") until interrupted."""
+    import asyncio
+
+    host, _, port = address.rpartition(':')
+    server = HttpValidationServer(jobs=jobs, max_queue=max_queue, cache=cache, options=options)
+    try:
+        asyncio.run(server.run(host or '127.0.0.1', int(port)))
+    except KeyboardInterrupt:
+        pass
+
+class InotifyWatcher:
+    """Wait for changes to files in a set of directories using Linux inotify."""
+    _IN_ATTRIB = 0x00000004
+    _IN_CLOSE_WRITE = 0x00000008
+    _IN_MOVED_FROM = 0x00000040
+    _IN_MOVED_TO = 0x00000080
+    _IN_CREATE = 0x00000100
+    _IN_DELETE = 0x00000200
+    _EVENT_MASK = _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+
+    def __init__(self, directories: Iterable[str]):
+        import ctypes
+        import ctypes.util
+
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+
+        self._directories = {}
+        try:
+            for directory in directories:
+                watch_descriptor = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self._EVENT_MASK)
+                if watch_descriptor < 0:
+                    raise OSError(ctypes.get_errno(), f"Could not watch '{directory}'")
+                self._directories[watch_descriptor] = directory
+        except BaseException:
+            # The caller never gets the watcher to close, so the descriptor would leak
+            os.close(self._fd)
+            raise
+
+    def wait(self, timeout: Optional[float]) -> set:
+        """Return the paths changed within timeout seconds (None waits forever), empty on timeout."""
+        import select
+        import struct
+
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        changed_paths = set()
+        try:
+            buffer = os.read(self._fd, 65536)
+        except BlockingIOError:
+            return changed_paths
+
+        offset = 0
+        while offset < len(buffer):
+            watch_descriptor, _, _, name_length = struct.unpack_from('iIII', buffer, offset)
+            offset += 16
+            name = buffer[offset:offset + name_length].rstrip(b'\0')
+            offset += name_length
+            if watch_descriptor in self._directories and name:
+                changed_paths.add(os.path.join(self._directories[watch_descriptor], os.fsdecode(name)))
+        return changed_paths
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+class PollingWatcher:
+    """Wait for changes to files in a set of directories by comparing their stat results."""
+
+    def __init__(self, directories: Iterable[str], interval: float = 0.5):
+        self._directories = list(directories)
+        self._interval = interval
+        self._snapshot = self._take_snapshot()
+
+    def _take_snapshot(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        for directory in self._directories:
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_file():
+                            stat = entry.stat()
+                            snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                continue
+        return snapshot
+
+    def wait(self, timeout: Optional[float]) -> set:
+        """Return the paths changed within timeout seconds (None waits forever), empty on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            sleep_time = self._interval if deadline is None else min(self._interval, max(0.0, deadline - time.monotonic()))
+            time.sleep(sleep_time)
+            snapshot = self._take_snapshot()
+            changed_paths = {
+                path for path in snapshot.keys() | self._snapshot.keys() if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+            if changed_paths or (deadline is not None and time.monotonic() >= deadline):
+                return changed_paths
+
+    def close(self) -> None:
+        pass
+
+def get_result_errors(result: ValidationResult) -> Dict[str, Dict[str, Any]]:
+    """Return the errors of a result keyed by document path and message, used to diff results."""
+    if result.status == ValidationResult.VALID:
+        return {}
+    if result.status == ValidationResult.ERROR and not result.locations:
+        return {f"Error: {result.message}": {'line': None, 'column': None}}
+    errors = {}
+    for location in result.locations:
+        path = '.'.join(str(part) for part in location['path'])
+        errors[f"{path}: {location['message']}" if path else str(location['message'])] = location
+    return errors
+
+def watch(
+        paths: List[str],
+        cache: Optional[ResultCache] = None,
+        options: Optional[ValidationOptions] = None,
+        debounce: float = 0.2,
+        poll_interval: float = 0.5,
+        positions: bool = False,
+) -> None:
+    """Revalidate config files whenever they change and print how their errors changed.
+
+    Paths can be config files or directories, in which case every .yml/.yaml file in the
+    directory is watched. Parent directories are watched rather than the files themselves
+    so that editors saving through a rename are picked up. Bursts of events are coalesced
+    until no new event arrived for the debounce period, and files whose content did not
+    change are not revalidated.
+    """
+    import hashlib
+
+    watched_files = set()
+    watched_directories = {}
+    display_names = {}
+    for path in paths:
+        if os.path.isdir(path):
+            watched_directories[os.path.abspath(path)] = path
+        else:
+            watched_files.add(os.path.abspath(path))
+            display_names[os.path.abspath(path)] = path
+
+    def is_watched(path):
+        return path in watched_files or (
+            os.path.dirname(path) in watched_directories and path.endswith(('.yml', '.yaml'))
+        )
+
+    def get_display_name(path):
+        # Report files by the path they were given as, or found under, on the command line
+        if path not in display_names:
+            display_names[path] = os.path.join(watched_directories[os.path.dirname(path)], os.path.basename(path))
+        return display_names[path]
+
+    def read_content(path):
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    directories = set(watched_directories) | {os.path.dirname(path) for path in watched_files}
+    try:
+        watcher = InotifyWatcher(directories)
+        print(f"Watching {len(paths)} paths for changes using inotify (Ctrl+C to stop)", file=sys.stderr)
+    except (OSError, AttributeError):
+        watcher = PollingWatcher(directories, interval=poll_interval)
+        print(f"Watching {len(paths)} paths for changes by polling (Ctrl+C to stop)", file=sys.stderr)
+
+    content_hashes = {}
+    previous_errors = {}
+
+    initial_files = set(watched_files)
+    for directory in watched_directories:
+        initial_files.update(
+            os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(('.yml', '.yaml'))
+        )
+    for path in sorted(initial_files):
+        content = read_content(path)
+        content_hashes[path] = hashlib.sha256(content).digest() if content is not None else None
+        result = validate_config_file(get_display_name(path), cache=cache, options=options)
+        previous_errors[path] = get_result_errors(result)
+        print_validation_result(result, positions=positions)
+
+    try:
+        while True:
+            changed_paths = watcher.wait(None)
+            # Coalesce the burst of events editors emit for a single save
+            while True:
+                more_changed_paths = watcher.wait(debounce)
+                if not more_changed_paths:
+                    break
+                changed_paths |= more_changed_paths
+
+            for path in sorted(path for path in changed_paths if is_watched(path)):
+                content = read_content(path)
+                content_hash = hashlib.sha256(content).digest() if content is not None else None
+                if path in content_hashes and content_hashes[path] == content_hash:
+                    continue
+                content_hashes[path] = content_hash
+
+                display_name = get_display_name(path)
+                result = validate_config_file(display_name, cache=cache, options=options)
+                errors = get_result_errors(result)
+                old_errors = previous_errors.get(path, {})
+                previous_errors[path] = errors
+
+                added = [error for error in errors if error not in old_errors]
+                resolved = [error for error in old_errors if error not in errors]
+                timestamp = time.strftime('%H:%M:%S')
+                if not errors:
+                    print(f"[{timestamp}] '{display_name}' is valid ({len(resolved)} errors resolved)")
+                else:
+                    print(f"[{timestamp}] '{display_name}': {len(added)} new, {len(resolved)} resolved, {len(errors)} total errors")
+                for error in added:
+                    location = errors[error]
+                    position = f"{location['line']}:{location['column']} " if location['line'] else ''
+                    print(f"  + {position}{error}")
+                for error in resolved:
+                    print(f"  - {error}")
+                sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+def get_utf16_length(text: str) -> int:
+    """Return the length of text in UTF-16 code units, the unit of LSP positions."""
+    if text.isascii():
+        return len(text)
+    return len(text.encode('utf-16-le')) // 2
+
+def get_utf16_offset(line: str, character: int) -> int:
+    """Convert an LSP character position in UTF-16 code units on a line to a string index."""
+    if line.isascii():
+        return min(character, len(line))
+    units = 0
+    for index, char in enumerate(line):
+        if units >= character:
+            return index
+        units += 2 if ord(char) > 0xFFFF else 1
+    return len(line)
+
+class LanguageServerDocument:
+    """Text of a document open in the editor, kept in sync by applying its edits."""
+
+    def __init__(self, uri: str, text: str, version: int):
+        self.uri = uri
+        self.text = text
+        self.version = version
+
+    def get_offset(self, position: Dict[str, int]) -> int:
+        line_start = 0
+        for _ in range(position['line']):
+            newline = self.text.find('\n', line_start)
+            if newline == -1:
+                return len(self.text)
+            line_start = newline + 1
+        line_end = self.text.find('\n', line_start)
+        line = self.text[line_start:line_end if line_end != -1 else len(self.text)]
+        return line_start + get_utf16_offset(line, position['character'])
+
+    def apply_change(self, change: Dict[str, Any]) -> None:
+        """Apply a change of a textDocument/didChange notification, a full or an incremental one."""
+        if 'range' not in change:
+            self.text = change['text']
+            return
+        start = self.get_offset(change['range']['start'])
+        end = self.get_offset(change['range']['end'])
+        self.text = self.text[:start] + change['text'] + self.text[end:]
+
+class LanguageServer:
+    """Language server publishing validation errors of open documents as diagnostics.
+
+    Speaks JSON-RPC with Content-Length framing over stdin and stdout. Documents are kept in
+    memory and updated with incremental edits. A document is revalidated once no edit arrived
+    for the debounce period, on a single worker thread. Runs superseded by a newer edit are
+    not started, and their results are dropped if they were already running.
+    """
+
+    def __init__(
+            self,
+            cache: Optional[ResultCache] = None,
+            options: Optional[ValidationOptions] = None,
+            debounce: float = 0.01,
+            input_stream: Any = None,
+            output_stream: Any = None,
+    ):
+        import queue
+
+        self.cache = cache
+        self.options = options
+        self.debounce = debounce
+        self.input_stream = input_stream or sys.stdin.buffer
+        self.output_stream = output_stream or sys.stdout.buffer
+        self.documents = {}
+        # Documents waiting for their debounce period to end, by uri
+        self.pending_validations = {}
+        self.events = queue.Queue()
+        self.is_shutdown = False
+
+    def read_message(self) -> Optional[Dict[str, Any]]:
+        """Return the next message, or None at the end of the input.
+
+        Raises ValueError for a missing or invalid Content-Length and a body that is not JSON.
+        """
+        import json
+
+        content_length = None
+        while True:
+            line = self.input_stream.readline()
+            if not line:
+                return None
+            line = line.strip()
+            if not line:
+                break
+            name, _, value = line.partition(b':')
+            if name.strip().lower() == b'content-length':
+                content_length = value.strip()
+        if content_length is None:
+            raise ValueError('Missing Content-Length header')
+        if not content_length.isdigit():
+            raise ValueError(f"Invalid Content-Length {content_length.decode('latin-1')!r}")
+        return json.loads(self.input_stream.read(int(content_length)))
+
+    def send_message(self, message: Dict[str, Any]) -> None:
+        import json
+
+        body = json.dumps(message).encode('utf-8')
+        self.output_stream.write(f"Content-Length: {len(body)}\r\n\r\n".encode('ascii') + body)
+        self.output_stream.flush()
+
+    def read_messages(self) -> None:
+        while True:
+            try:
+                message = self.read_message()
+            except ValueError as e:
+                # Reported by serve() so responses are only written from one thread
+                self.events.put(('parse_error', str(e)))
+                continue
+            self.events.put(('message', message))
+            # Stop reading after exit so the thread does not hold stdin while the interpreter shuts down
+            if message is None or (isinstance(message, dict) and message.get('method') == 'exit'):
+                return
+
+    def serve(self) -> int:
+        """Handle messages until the client exits, returning the process exit code."""
+        import queue
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+
+        threading.Thread(target=self.read_messages, daemon=True).start()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            while True:
+                timeout = None
+                if self.pending_validations:
+                    timeout = max(0.0, min(self.pending_validations.values()) - time.monotonic())
+                try:
+                    event = self.events.get(timeout=timeout)
+                except queue.Empty:
+                    event = None
+
+                if event is not None and event[0] == 'message':
+                    message = event[1]
+                    if message is None or (isinstance(message, dict) and message.get('method') == 'exit'):
+                        return 0 if self.is_shutdown else 1
+                    if isinstance(message, dict):
+                        self.handle_message(message)
+                    else:
+                        self.send_message({
+                            'jsonrpc': '2.0',
+                            'id': None,
+                            'error': {'code': -32600, 'message': "Invalid request: not a JSON object"},
+                        })
+                elif event is not None and event[0] == 'parse_error':
+                    self.send_message({
+                        'jsonrpc': '2.0',
+                        'id': None,
+                        'error': {'code': -32700, 'message': f"Parse error: {event[1]}"},
+                    })
+                elif event is not None and event[0] == 'result':
+                    self.publish_result(*event[1:])
+
+                now = time.monotonic()
+                for uri, due in list(self.pending_validations.items()):
+                    if due <= now:
+                        del self.pending_validations[uri]
+                        document = self.documents[uri]
+                        executor.submit(self.validate, uri, document.version, document.text)
+
+    def validate(self, uri: str, version: int, text: str) -> None:
+        document = self.documents.get(uri)
+        if document is None or document.version != version:
+            # Superseded by a newer edit while waiting for the worker
+            return
+        result = validate_config_content(text, get_uri_path(uri), cache=self.cache, options=self.options)
+        self.events.put(('result', uri, version, result))
+
+    def handle_message(self, message: Dict[str, Any]) -> None:
+        method = message.get('method')
+        params = message.get('params') or {}
+        if method == 'initialize':
+            self.send_message({'jsonrpc': '2.0', 'id': message['id'], 'result': {
+                'capabilities': {'textDocumentSync': {'openClose': True, 'change': 2}},
+                'serverInfo': {'name': 'biolib-check'},
+            }})
+        elif method == 'shutdown':
+            self.is_shutdown = True
+            self.send_message({'jsonrpc': '2.0', 'id': message['id'], 'result': None})
+        elif method == 'textDocument/didOpen':
+            text_document = params['textDocument']
+            uri = text_document['uri']
+            self.documents[uri] = LanguageServerDocument(uri, text_document['text'], text_document.get('version', 0))
+            self.schedule_validation(uri)
+        elif method == 'textDocument/didChange':
+            document = self.documents.get(params['textDocument']['uri'])
+            if document is not None:
+                for change in params['contentChanges']:
+                    document.apply_change(change)
+                document.version = params['textDocument'].get('version', document.version + 1)
+                self.schedule_validation(document.uri)
+        elif method == 'textDocument/didClose':
+            uri = params['textDocument']['uri']
+            self.documents.pop(uri, None)
+            self.pending_validations.pop(uri, None)
+            self.send_message({
+                'jsonrpc': '2.0',
+                'method': 'textDocument/publishDiagnostics',
+                'params': {'uri': uri, 'diagnostics': []},
+            })
+        elif 'id' in message:
+            self.send_message({
+                'jsonrpc': '2.0',
+                'id': message['id'],
+                'error': {'code': -32601, 'message': f"Method not found: {method}"},
+            })
+
+    def schedule_validation(self, uri: str) -> None:
+        self.pending_validations[uri] = time.monotonic() + self.debounce
+
+    def publish_result(self, uri: str, version: int, result: ValidationResult) -> None:
+        document = self.documents.get(uri)
+        if document is None or document.version != version:
+            # The document changed while it was validated, a newer run will publish
+            return
+        self.send_message({
+            'jsonrpc': '2.0',
+            'method': 'textDocument/publishDiagnostics',
+            'params': {'uri': uri, 'version': version, 'diagnostics': get_diagnostics(result, document.text)},
+        })
+
+def get_uri_path(uri: str) -> str:
+    """Return the local path of a file:// URI, other URIs are used as the name as they are."""
+    if not uri.startswith('file://'):
+        return uri
+    from urllib.parse import unquote, urlparse
+
+    return unquote(urlparse(uri).path)
+
+def get_diagnostics(result: ValidationResult, text: str) -> List[Dict[str, Any]]:
+    """Convert the errors of a result to LSP diagnostics spanning the node they refer to.
+
+    Errors located at an empty range, like the start of the document, or without a position
+    span from their position to the end of its line.
+    """
+    if result.status == ValidationResult.VALID:
+        return []
+
+    locations = result.locations
+    if not locations:
+        locations = [{'message': result.message or '', 'line': None, 'column': None}]
+    lines = text.split('\n')
+
+    def get_position(line_number, column_number):
+        line_index = min(max(line_number - 1, 0), len(lines) - 1)
+        line = lines[line_index]
+        return {'line': line_index, 'character': get_utf16_length(line[:max(column_number - 1, 0)])}
+
+    diagnostics = []
+    for location in locations:
+        start = get_position(location['line'] or 1, location['column'] or 1)
+        end_line, end_column = location.get('end_line'), location.get('end_column')
+        if end_line is None or (end_line, end_column) == (location['line'], location['column']):
+            end = {'line': start['line'], 'character': get_utf16_length(lines[start['line']].rstrip('\r'))}
+        else:
+            end = get_position(end_line, end_column)
+        diagnostics.append({
+            'range': {'start': start, 'end': end},
+            'severity': 1,
+            'source': 'biolib-check',
+            'message': str(location['message']),
+        })
+    return diagnostics
+
+# Entry points validating whole files, these are not profiled as rules
+profile_excluded_functions = frozenset([
+    'validate_config_file',
+    'validate_config_content',
+    'validate_source',
+    'validate_sources',
+    'validate_bytes',
+    'validate_path',
+    'validate_many',
+    'validate_git_range',
+])
+
+class Profiler:
+    """Records call counts, cumulative and maximum time of the validation rules per file.
+
+    Stats map a name to [calls, total seconds, max seconds]. The rows are the validate_* rules,
+    "load_yaml" for parsing, "render" for printing a result and "file" for the whole file.
+    Times are cumulative, so a rule includes the rules it calls. Hooks added with add_hook are
+    called as hook(config_file, stats) for every file passed to add_result, with stats as
+    returned by get_stats_dict, e.g. to forward the numbers to a metrics system.
+    """
+
+    def __init__(self):
+        self.file_stats = None
+        self.total_stats = {}
+        self.files = []
+        self.hooks = []
+
+    def add_hook(self, hook: Callable[[str, Dict[str, Dict[str, float]]], None]) -> None:
+        self.hooks.append(hook)
+
+    @staticmethod
+    def add_time(stats: Dict[str, List[float]], name: str, seconds: float, calls: int = 1) -> None:
+        entry = stats.get(name)
+        if entry is None:
+            stats[name] = [calls, seconds, seconds]
+        else:
+            entry[0] += calls
+            entry[1] += seconds
+            if seconds > entry[2]:
+                entry[2] = seconds
+
+    def wrap_rule(self, name: str, function: Callable) -> Callable:
+        """Return function timed into the stats of the file being validated."""
+        import functools
+
+        perf_counter = time.perf_counter
+
+        @functools.wraps(function)
+        def timed_rule(*args, **kwargs):
+            stats = self.file_stats
+            if stats is None:
+                return function(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.add_time(stats, name, perf_counter() - start)
+
+        return timed_rule
+
+    def wrap_source(self, function: Callable) -> Callable:
+        """Return validate_source collecting the stats of each file into result.profile."""
+        import functools
+
+        @functools.wraps(function)
+        def timed_source(*args, **kwargs):
+            stats = self.file_stats = {}
+            start = time.perf_counter()
+            try:
+                result = function(*args, **kwargs)
+            finally:
+                self.file_stats = None
+            self.add_time(stats, 'file', time.perf_counter() - start)
+            result.profile = stats
+            return result
+
+        return timed_source
+
+    def add_result(self, result: ValidationResult, render_seconds: Optional[float] = None) -> None:
+        """Add the stats of a validated file to the totals and pass them to the hooks."""
+        stats = result.profile if result.profile is not None else {}
+        if render_seconds is not None:
+            self.add_time(stats, 'render', render_seconds)
+        self.files.append((result.config_file, stats))
+        for name, (calls, total, maximum) in stats.items():
+            self.add_time(self.total_stats, name, total, calls=calls)
+            self.total_stats[name][2] = max(self.total_stats[name][2], maximum)
+        if self.hooks:
+            stats_dict = self.get_stats_dict(stats)
+            for hook in self.hooks:
+                hook(result.config_file, stats_dict)
+
+    @staticmethod
+    def get_stats_dict(stats: Dict[str, List[float]]) -> Dict[str, Dict[str, float]]:
+        return {
+            name: {'calls': calls, 'total_seconds': total, 'max_seconds': maximum}
+            for name, (calls, total, maximum) in stats.items()
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'files': [
+                {'path': config_file, 'stats': self.get_stats_dict(stats)} for config_file, stats in self.files
+            ],
+            'total': self.get_stats_dict(self.total_stats),
+        }
+
+    def print_report(self, file: Optional[TextIO] = None) -> None:
+        """Print the aggregated stats as a table, slowest first."""
+        print(f"Profile of {len(self.files)} file{'s' if len(self.files) != 1 else ''}:", file=file)
+        print(f"  {'name':<44}{'calls':>10}{'total ms':>12}{'mean ms':>12}{'max ms':>12}", file=file)
+        rows = sorted(self.total_stats.items(), key=lambda item: item[1][1], reverse=True)
+        for name, (calls, total, maximum) in rows:
+            print(
+                f"  {name:<44}{calls:>10}{total * 1000:>12.3f}{total / calls * 1000:>12.4f}{maximum * 1000:>12.3f}",
+                file=file,
+            )
+
+_profiler = None
+_unprofiled_functions = {}
+
+def enable_profiling() -> Profiler:
+    """Replace the validation rules with timed wrappers and return the Profiler recording them.
+
+    Only the module globals are swapped, so without profiling the rules run unchanged. Generator
+    functions are never wrapped, the wrapper would only time creating the generator.
+    """
+    import inspect
+
+    global _profiler
+    if _profiler is not None:
+        return _profiler
+
+    profiler = Profiler()
+    module_globals = globals()
+    for name, function in list(module_globals.items()):
+        if name == 'load_yaml' or (
+                name.startswith('validate_') and inspect.isfunction(function)
+                and not inspect.isgeneratorfunction(function) and name not in profile_excluded_functions
+        ):
+            _unprofiled_functions[name] = function
+            module_globals[name] = profiler.wrap_rule(name, function)
+    _unprofiled_functions['validate_source'] = validate_source
+    module_globals['validate_source'] = profiler.wrap_source(validate_source)
+    # The root level rules are called from this list rather than by name
+    app_version_field_validators[:] = [module_globals[function.__name__] for function in app_version_field_validators]
+    _profiler = profiler
+    return profiler
+
+def disable_profiling() -> None:
+    """Restore the functions replaced by enable_profiling."""
+    global _profiler
+    globals().update(_unprofiled_functions)
+    app_version_field_validators[:] = [
+        _unprofiled_functions.get(function.__name__, function) for function in app_version_field_validators
+    ]
+    _unprofiled_functions.clear()
+    _profiler = None
+
+def print_startup_report(file: Optional[TextIO] = None) -> None:
+    """Print the time spent in each phase of the cold start."""
+    print("Startup report:", file=file)
+    print(f"  {'interpreter startup (cpu)':<34}{_startup_cpu_time * 1000:8.1f} ms", file=file)
+    for name, seconds in startup_timings:
+        print(f"  {name:<34}{seconds * 1000:8.1f} ms", file=file)
+    total = time.perf_counter() - _startup_time
+    print(f"  {'total since check.py start':<34}{total * 1000:8.1f} ms", file=file)
+
+def main():
+    """Main function to validate one or more config.yml files."""
+    start = time.perf_counter()
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Validate .biolib/config.yml files.')
+    parser.add_argument(
+        'config_files',
+        nargs='*',
+        metavar='config_file',
+        help='Path to a config.yml file, a glob pattern (e.g. "apps/**/.biolib/config.yml") '
+             'or "-" to read newline separated paths from stdin',
+    )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=1,
+        help='Number of worker processes used to validate multiple files (0 uses all CPUs)',
+    )
+    parser.add_argument(
+        '--serve',
+        metavar='SOCKET',
+        help='Run a validation server on the given Unix socket, see check_client.py',
+    )
+    parser.add_argument(
+        '--cache',
+        metavar='PATH',
+        help='Path to an SQLite file used to cache results by config content and validator version',
+    )
+    parser.add_argument(
+        '--cache-max-entries',
+        type=int,
+        default=10000,
+        help='Maximum number of results kept in the cache before evicting the least recently used (default: 10000)',
+    )
+    parser.add_argument(
+        '--cache-stats',
+        action='store_true',
+        help='Print cache hit rate statistics after validating',
+    )
+    parser.add_argument(
+        '--positions',
+        action='store_true',
+        help='Print each error as "path:line:column: message"',
+    )
+    parser.add_argument(
+        '--startup-report',
+        action='store_true',
+        help='Print a breakdown of the time spent on imports, initialization and validation to stderr',
+    )
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Keep running and revalidate the given files, or .yml files in the given directories, when they change',
+    )
+    parser.add_argument(
+        '--debounce-ms',
+        type=int,
+        help='Time to wait for further changes before revalidating (default: 200 for --watch, 10 for --lsp)',
+    )
+    parser.add_argument(
+        '--lsp',
+        action='store_true',
+        help='Run a language server over stdin and stdout publishing diagnostics for open config files',
+    )
+    parser.add_argument(
+        '--http',
+        metavar='HOST:PORT',
+        help='Run an HTTP validation server, validating on --jobs worker processes',
+    )
+    parser.add_argument(
+        '--max-queue',
+        type=int,
+        default=256,
+        help='Maximum number of configs queued for validation by the HTTP server before rejecting requests',
+    )
+    parser.add_argument(
+        '--fail-fast',
+        action='store_true',
+        help='Stop validating a file at the first error, equivalent to --max-errors 1',
+    )
+    parser.add_argument(
+        '--max-errors',
+        type=int,
+        metavar='N',
+        help='Stop validating a file once N errors were found',
+    )
+    parser.add_argument(
+        '--check-files',
+        action='store_true',
+        help='Check that description_file, license_file and source_files paths exist in the app directory',
+    )
+    parser.add_argument(
+        '--estimate-upload',
+        action='store_true',
+        help='Report the number of files and bytes uploaded for each app, excluding source_files_ignore matches',
+    )
+    parser.add_argument(
+        '--max-upload-size',
+        type=parse_size,
+        metavar='SIZE',
+        help='Report apps uploading more than SIZE (e.g. 500MB) as invalid, implies --estimate-upload',
+    )
+    parser.add_argument(
+        '--suggest',
+        action='store_true',
+        help='Suggest the closest valid values for misspelled field names, types, machines and images',
+    )
+    parser.add_argument(
+        '--discover',
+        metavar='ROOT',
+        action='append',
+        help='Find and validate all .biolib/config.yml files below ROOT, can be given multiple times',
+    )
+    parser.add_argument(
+        '--exclude',
+        metavar='GLOB',
+        action='append',
+        help='Skip directories matching GLOB by name or relative path when discovering configs',
+    )
+    parser.add_argument(
+        '--discover-threads',
+        type=int,
+        default=1,
+        help='Number of threads listing directories concurrently when discovering configs (default: 1)',
+    )
+    parser.add_argument(
+        '--git-range',
+        metavar='RANGE',
+        help='Validate the config files at every commit of a git revision range, e.g. "v1.0..HEAD"',
+    )
+    parser.add_argument(
+        '--git-pathspec',
+        default='**/.biolib/config.yml',
+        help='Glob of the config files to validate with --git-range (default: **/.biolib/config.yml)',
+    )
+    parser.add_argument(
+        '--archive',
+        action='append',
+        metavar='ARCHIVE',
+        help='Validate the .biolib/config.yml files in a tar (optionally compressed) or zip archive without '
+             'extracting it, "-" reads the archive from stdin. Can be given multiple times',
+    )
+    parser.add_argument(
+        '--stdin-documents',
+        action='store_true',
+        help='Validate each document of a multi-document YAML stream on stdin, separated by "---", as a config',
+    )
+    parser.add_argument(
+        '--format',
+        choices=['text', 'ndjson', 'sarif'],
+        default='text',
+        help='Output format: human readable text (default), one JSON record per file, or a SARIF 2.1.0 log',
+    )
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Validate modules and arguments while parsing to bound memory use on very large configs',
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Print call counts and times of the validation rules, parsing and rendering to stderr',
+    )
+    parser.add_argument(
+        '--profile-json',
+        metavar='PATH',
+        help='Write the per file and aggregated profile as JSON to PATH, implies --profile',
+    )
+    parser.add_argument(
+        '--limits',
+        action='store_true',
+        help='Enforce resource limits while parsing untrusted configs, always on for --serve and --http',
+    )
+    limit_defaults = LoaderLimits()
+    for limit, help_text in [
+        ('max_bytes', 'Maximum size of a config file in bytes'),
+        ('max_nodes', 'Maximum number of YAML nodes in a config'),
+        ('max_depth', 'Maximum nesting depth of a config'),
+        ('max_alias_expansions', 'Maximum number of nodes that aliases may expand to'),
+        ('max_scalar_length', 'Maximum length of a single value in characters'),
+    ]:
+        parser.add_argument(
+            '--' + limit.replace('_', '-'),
+            type=int,
+            metavar='N',
+            help=f'{help_text}, implies --limits (default: {getattr(limit_defaults, limit)})',
+        )
+    args = parser.parse_args()
+    record_startup_phase('argument parsing', start)
+
+    cache = ResultCache(args.cache, max_entries=args.cache_max_entries) if args.cache else None
+    limit_overrides = {
+        limit: value for limit, value in vars(args).items()
+        if value is not None and limit in limit_defaults.__dict__
+    }
+    if args.limits or limit_overrides or args.serve or args.http:
+        limits = LoaderLimits(**limit_overrides)
+    else:
+        limits = None
+    options = ValidationOptions(
+        max_errors=1 if args.fail_fast else args.max_errors,
+        stream=args.stream,
+        limits=limits,
+        check_files=args.check_files,
+        estimate_upload=args.estimate_upload,
+        max_upload_bytes=args.max_upload_size,
+        suggest=args.suggest,
+    )
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    if args.serve:
+        try:
+            serve(args.serve, cache=cache, options=options)
+        except FileExistsError as e:
+            parser.error(str(e))
+        sys.exit(0)
+
+    if args.http:
+        serve_http(args.http, jobs=jobs, max_queue=args.max_queue, cache=cache, options=options)
+        sys.exit(0)
+
+    if args.lsp:
+        server = LanguageServer(
+            cache=cache,
+            options=options,
+            debounce=(args.debounce_ms if args.debounce_ms is not None else 10) / 1000,
+        )
+        sys.exit(server.serve())
+
+    if args.git_range:
+        if args.config_files:
+            parser.error('config_file arguments can not be combined with --git-range')
+    elif not args.config_files and not args.discover and not args.archive and not args.stdin_documents:
+        parser.error('at least one config_file is required')
+    stdin_readers = ('-' in args.config_files) + (args.archive or []).count('-') + args.stdin_documents
+    if stdin_readers > 1:
+        parser.error('stdin can only be read once, by "-", --archive - or --stdin-documents')
+
+    if args.watch:
+        watch(
+            args.config_files,
+            cache=cache,
+            options=options,
+            debounce=(args.debounce_ms if args.debounce_ms is not None else 200) / 1000,
+            positions=args.positions,
+        )
+        sys.exit(0)
+
+    is_batch = (
+        args.git_range is not None
+        or args.discover is not None
+        or args.archive is not None
+        or args.stdin_documents
+        or len(args.config_files) > 1
+        or any(pattern == '-' or is_glob_pattern(pattern) for pattern in args.config_files)
+    )
+
+    if args.format == 'ndjson':
+        reporter = NdjsonReporter()
+    elif args.format == 'sarif':
+        reporter = SarifReporter()
+    else:
+        reporter = TextReporter(is_batch=is_batch, positions=args.positions)
+
+    profiler = enable_profiling() if args.profile or args.profile_json else None
+
+    start = time.perf_counter()
+    status_counts = collections.Counter()
+    cache_hits = 0
+    if args.git_range:
+        results = validate_git_range(
+            args.git_range,
+            pathspec=args.git_pathspec,
+            jobs=jobs,
+            cache=cache,
+            options=options,
+        )
+    else:
+        import itertools
+
+        sources = iter_config_files(args.config_files) if is_batch else args.config_files
+        if args.discover:
+            # Configs are validated while the rest of the tree is still being traversed
+            discovered = iter_discovered_config_files(args.discover, excludes=args.exclude, threads=args.discover_threads)
+            sources = itertools.chain(sources, discovered)
+        for archive in args.archive or []:
+            sources = itertools.chain(sources, iter_archive_sources(archive, limits=options.limits))
+        if args.stdin_documents:
+            sources = itertools.chain(sources, iter_yaml_document_sources(sys.stdin.buffer))
+        results = iter_validation_results(sources, jobs=jobs if is_batch else 1, cache=cache, options=options)
+    try:
+        for result in results:
+            status_counts[result.status] += 1
+            cache_hits += result.cached
+            if profiler is None:
+                reporter.report(result)
+            else:
+                render_start = time.perf_counter()
+                reporter.report(result)
+                profiler.add_result(result, render_seconds=time.perf_counter() - render_start)
+    except GitError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    record_startup_phase('validation (incl. lazy imports)', start)
+
+    total = sum(status_counts.values())
+    reporter.finish(status_counts)
+    if args.cache_stats and cache:
+        print_cache_stats(cache, cache_hits=cache_hits, total=total)
+    if args.startup_report:
+        print_startup_report(file=sys.stderr)
+    if profiler is not None:
+        profiler.print_report(file=sys.stderr)
+        if args.profile_json:
+            import json
+
+            with open(args.profile_json, 'w') as f:
+                json.dump(profiler.to_dict(), f, indent=2)
+    sys.exit(0 if total and status_counts[ValidationResult.VALID] == total else 1)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
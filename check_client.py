@@ -0,0 +1,70 @@
+"""
+Thin client for a running `check.py --serve` validation server.
+
+Only imports the standard library modules needed to talk to the socket, so each
+invocation avoids the interpreter work of loading the validator itself.
+"""
+
+import json
+import os
+import socket
+import sys
+
+DEFAULT_SOCKET_PATH = os.environ.get('BIOLIB_CHECK_SOCKET', '/tmp/biolib-check.sock')
+
+def main():
+    """Send config files to the validation server and print the results."""
+    args = sys.argv[1:]
+    socket_path = DEFAULT_SOCKET_PATH
+    send_content = False
+    config_files = []
+
+    while args:
+        arg = args.pop(0)
+        if arg == '--socket' and args:
+            socket_path = args.pop(0)
+        elif arg == '--send-content':
+            send_content = True
+        elif arg in ('-h', '--help'):
+            print(
+                'usage: check_client.py [--socket SOCKET] [--send-content] config_file [config_file ...]\n\n'
+                'Validate config files using a running "check.py --serve SOCKET" server. With --send-content '
+                'the file contents are sent instead of their paths.'
+            )
+            sys.exit(0)
+        else:
+            config_files.append(arg)
+
+    if not config_files:
+        print('Error: at least one config_file is required', file=sys.stderr)
+        sys.exit(2)
+
+    exit_code = 0
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(socket_path)
+        except OSError as e:
+            print(f"Error: Could not connect to validation server at '{socket_path}': {e}", file=sys.stderr)
+            sys.exit(2)
+
+        stream = client.makefile('rwb')
+        for config_file in config_files:
+            if send_content:
+                try:
+                    with open(config_file, 'r') as f:
+                        request = {'content': f.read(), 'name': config_file}
+                except OSError:
+                    request = {'path': os.path.abspath(config_file), 'name': config_file}
+            else:
+                request = {'path': os.path.abspath(config_file), 'name': config_file}
+
+            stream.write(json.dumps(request).encode('utf-8') + b'\n')
+            stream.flush()
+            response = json.loads(stream.readline())
+            sys.stdout.write(response['output'])
+            exit_code = max(exit_code, response['exit_code'])
+
+    sys.exit(exit_code)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+"""
+Benchmark the validator's hot paths on synthetic config.yml documents.
+
+Generates realistic and adversarial configs with many modules, arguments, file mappings and
+options, then times YAML parsing and each validation stage separately. Results are written
+as JSON so they can be compared between runs.
+
+    python3 test/bench.py --scale 1 --repeat 5 --output bench_output.txt
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import check  # noqa: E402
+
+def generate_module(rng, index, adversarial, mappings_per_module):
+    """Generate a module definition, adversarial modules contain many invalid fields and mappings."""
+    module = {
+        'image': rng.choice([
+            'dockerhub://python:3.9-slim',
+            'local-docker://my-app:latest',
+            'biolib-app://biolib/python:3.9',
+        ]),
+        'command': f'python3 main.py --module {index}',
+        'working_directory': '/home/biolib/',
+        'input_files': ['COPY / /home/biolib/'],
+        'output_files': ['COPY /home/biolib/output/ /'],
+        'source_files': [
+            f'COPY /src/file_{index}_{file_index}.py /home/biolib/src/file_{file_index}.py'
+            for file_index in range(mappings_per_module)
+        ],
+        'default_machine': rng.choice(list(check.biolib_machine_type_to_resource_requirements.keys())),
+    }
+    module['input_files'].extend(
+        f'COPY ${argument_index + 1} /home/biolib/inputs/${argument_index + 1}'
+        for argument_index in range(mappings_per_module // 4)
+    )
+    if adversarial:
+        module['input_files'].extend([
+            f'COPY $0 /home/biolib/bad_{index}',
+            f'COPY /data/ /home/biolib/file_{index}',
+            'COPY relative/path /home/biolib/',
+            'COPY //double /home/biolib//double',
+        ] * (mappings_per_module // 4 + 1))
+        module['default_machine'] = 'cpu.nonexistent'
+        module['gpu'] = 'sometimes'
+        module['required_memory_in_bytes'] = 1000
+        module['unknown_field'] = True
+    return module
+
+def generate_argument(rng, index, adversarial, options_per_argument):
+    """Generate an argument definition, adversarial arguments have invalid types and fields."""
+    argument_type = rng.choice(['text', 'number', 'dropdown', 'multiselect', 'file', 'toggle', 'hidden'])
+    argument = {
+        'key': f'--argument-{index}',
+        'description': f'Argument number {index}',
+        'type': argument_type,
+        'required': bool(index % 2),
+        'default_value': '',
+    }
+    if argument_type in ('dropdown', 'multiselect'):
+        argument['options'] = {f'Option {option}': f'value_{option}' for option in range(options_per_argument)}
+    elif argument_type == 'toggle':
+        argument['options'] = {'on': 'yes', 'off': 'no'}
+    if adversarial:
+        argument['type'] = rng.choice(['txt', 'dropdown ', 'toggle'])
+        argument['options'] = {f'Option {option}': option for option in range(options_per_argument)}
+        argument['unknown_field'] = index
+        argument['required'] = 'yes'
+        del argument['description']
+    return argument
+
+def generate_config(seed, modules, arguments, mappings_per_module, options_per_argument, adversarial):
+    """Generate a synthetic config as YAML text."""
+    import yaml
+
+    rng = random.Random(seed)
+    config = {
+        'biolib_version': 2,
+        'modules': {
+            f'module-{index}': generate_module(rng, index, adversarial, mappings_per_module)
+            for index in range(modules)
+        },
+        'arguments': [
+            generate_argument(rng, index, adversarial, options_per_argument) for index in range(arguments)
+        ],
+    }
+    if adversarial:
+        config['unknown_root_field'] = 'value'
+        config['output_type'] = 'pdf'
+        config['main_output_file'] = 'relative.txt'
+    return yaml.safe_dump(config, sort_keys=False)
+
+def measure(function, repeat):
+    """Return the best wall time in seconds and the peak traced memory in bytes of calling function."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+def ignore_validation_errors(function):
+    def call():
+        try:
+            function()
+        except check.ValidationError:
+            pass
+    return call
+
+def benchmark_config(name, yaml_text, repeat):
+    """Time parsing and each validation stage on a single config."""
+    yaml_data, _ = check.load_yaml(yaml_text)
+    stages = {
+        'load_yaml': lambda: check.load_yaml(yaml_text),
+        'validate_yaml_config': ignore_validation_errors(lambda: check.validate_yaml_config(yaml_data, 2)),
+        'validate_tasks': lambda: check.validate_tasks(yaml_data, 2),
+        # A fresh memo per repeat, so repeats time hashing and validation rather than memo hits
+        'validate_tasks_memoized': lambda: check.validate_tasks(yaml_data, 2, memo=check.SubtreeMemo()),
+        'validate_arguments': lambda: check.validate_arguments(yaml_data),
+        'validate_mappings': lambda: [
+            check.validate_mappings(module_name, module, {}, mapping_type)
+            for module_name, module in yaml_data['modules'].items()
+            for mapping_type in ('input_files', 'output_files', 'source_files')
+        ],
+        'validate_config_content': lambda: check.validate_config_content(yaml_text, name),
+    }
+
+    results = {}
+    for stage, function in stages.items():
+        seconds, peak_memory = measure(function, repeat)
+        results[stage] = {
+            'seconds': seconds,
+            'files_per_second': 1 / seconds if seconds else None,
+            'peak_memory_bytes': peak_memory,
+        }
+    return {
+        'name': name,
+        'bytes': len(yaml_text.encode('utf-8')),
+        'modules': len(yaml_data['modules']),
+        'arguments': len(yaml_data['arguments']),
+        'stages': results,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the config.yml validator.')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiplier for the size of the generated configs')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of timed runs per stage, the best is reported')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the config generator')
+    parser.add_argument('--output', help='Write the JSON results to this file instead of stdout')
+    args = parser.parse_args()
+
+    def scaled(value):
+        return max(1, int(value * args.scale))
+
+    configs = {
+        'small': dict(modules=1, arguments=5, mappings_per_module=2, options_per_argument=3, adversarial=False),
+        'realistic': dict(
+            modules=scaled(20), arguments=scaled(200), mappings_per_module=scaled(20),
+            options_per_argument=scaled(20), adversarial=False,
+        ),
+        'large': dict(
+            modules=scaled(100), arguments=scaled(1000), mappings_per_module=scaled(50),
+            options_per_argument=scaled(100), adversarial=False,
+        ),
+        'adversarial': dict(
+            modules=scaled(100), arguments=scaled(1000), mappings_per_module=scaled(50),
+            options_per_argument=scaled(100), adversarial=True,
+        ),
+    }
+
+    results = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'yaml_loader': check.get_yaml_loader().__name__,
+        'repeat': args.repeat,
+        'scale': args.scale,
+        'configs': [],
+    }
+    for name, parameters in configs.items():
+        yaml_text = generate_config(args.seed, **parameters)
+        results['configs'].append(benchmark_config(name, yaml_text, args.repeat))
+        print(f"Benchmarked {name}", file=sys.stderr)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+if __name__ == '__main__':
+    main()
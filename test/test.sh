@@ -1,4 +1,261 @@
 for file in test/*.yml; do
     echo "Testing $file"
     python3 check.py "$file"
-done
\ No newline at end of file
+done
+echo "Testing --positions"
+# Each error is reported at the node it refers to: the root field, the module field, the
+# mapping item, the argument without a key, the argument field and the nested citation field
+expected_positions='test/positions.yml:2:1
+test/positions.yml:30:3
+test/positions.yml:8:5
+test/positions.yml:12:9
+test/positions.yml:9:5
+test/positions.yml:16:5
+test/positions.yml:20:5
+test/positions.yml:25:5'
+for options in "" "--stream"; do
+    positions=$(python3 check.py --positions $options test/positions.yml | cut -d: -f1-3)
+    if [ "$positions" != "$expected_positions" ]; then
+        echo "Unexpected --positions $options output:"
+        echo "$positions"
+        exit 1
+    fi
+done
+echo "Testing the library API"
+# Results of invalid configs must be JSON serializable through to_dict
+python3 -c "import json, check; json.dumps(check.validate_path('test/positions.yml').to_dict())" || exit 1
+echo "Testing language server diagnostics"
+# Diagnostics span the node of each error, lines and characters are 0-based
+python3 - <<'PYTHON' || exit 1
+import sys
+
+import check
+
+with open('test/positions.yml') as f:
+    text = f.read()
+diagnostics = check.get_diagnostics(check.validate_config_content(text, 'test/positions.yml'), text)
+ranges = [(d['range']['start']['line'], d['range']['start']['character'], d['range']['end']['line'], d['range']['end']['character']) for d in diagnostics]
+expected = [(1, 0, 1, 3), (29, 2, 29, 6), (7, 4, 7, 9), (11, 8, 11, 35)]
+if ranges[:4] != expected:
+    print(f"Unexpected diagnostic ranges {ranges}")
+    sys.exit(1)
+PYTHON
+echo "Testing malformed language server messages"
+# Each is answered with a parse error and the server keeps handling the messages after it
+python3 - <<'PYTHON' || exit 1
+import json
+import subprocess
+import sys
+
+def frame(body):
+    return f"Content-Length: {len(body)}\r\n\r\n".encode('ascii') + body
+
+messages = [
+    frame(b'{not json'),
+    b'Content-Length: ten\r\n\r\n',
+    frame(b'[1, 2]'),
+    frame(json.dumps({'jsonrpc': '2.0', 'id': 1, 'method': 'initialize', 'params': {}}).encode()),
+    frame(json.dumps({'jsonrpc': '2.0', 'id': 2, 'method': 'shutdown'}).encode()),
+    frame(json.dumps({'jsonrpc': '2.0', 'method': 'exit'}).encode()),
+]
+process = subprocess.run(
+    [sys.executable, 'check.py', '--lsp'], input=b''.join(messages), capture_output=True, timeout=10,
+)
+responses = []
+output = process.stdout
+while output:
+    header, _, output = output.partition(b'\r\n\r\n')
+    length = int(header.split(b':')[1])
+    responses.append(json.loads(output[:length]))
+    output = output[length:]
+codes = [response['error']['code'] if 'error' in response else response['id'] for response in responses]
+assert process.returncode == 0 and codes == [-32700, -32700, -32600, 1, 2], (process.returncode, codes, process.stderr)
+PYTHON
+echo "Testing --stream against whole document validation"
+for file in test/*.yml; do
+    for options in "" "--max-errors 2" "--fail-fast"; do
+        diff <(python3 check.py --format ndjson $options "$file" | sed 's/"duration": [0-9.e-]*//') \
+            <(python3 check.py --format ndjson --stream $options "$file" | sed 's/"duration": [0-9.e-]*//') > /dev/null || {
+            echo "--stream $options output differs for $file"
+            exit 1
+        }
+    done
+done
+echo "Testing --stream memory use"
+# Peak memory must not grow with the number of valid modules and arguments
+python3 - <<'PYTHON' || exit 1
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+def get_peak_rss_mb(entries):
+    with tempfile.NamedTemporaryFile('w', suffix='.yml', delete=False) as f:
+        f.write('biolib_version: 2\nmodules:\n')
+        for index in range(entries):
+            f.write(
+                f"  module_{index}:\n"
+                f"    image: 'local-docker://app:latest'\n"
+                f"    command: python3 main.py {index}\n"
+                f"    working_directory: /home/biolib/\n"
+                f"    input_files: ['COPY / /home/biolib/']\n"
+                f"    output_files: ['COPY /home/biolib/ /']\n"
+                f"    source_files: ['COPY /src/{index}.py /home/biolib/src/main.py']\n"
+            )
+        f.write('arguments:\n')
+        for index in range(entries):
+            f.write(f"  - {{key: --argument-{index}, description: Argument, type: text, required: false}}\n")
+    try:
+        # Children are measured in increasing size, so the maximum over all of them is the last one
+        subprocess.run([sys.executable, 'check.py', '--stream', f.name], stdout=subprocess.DEVNULL, check=True)
+    finally:
+        os.unlink(f.name)
+    return resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+
+small_mb, large_mb = get_peak_rss_mb(1000), get_peak_rss_mb(8000)
+print(f"Peak RSS: {small_mb:.1f} MB for 1000 entries, {large_mb:.1f} MB for 8000 entries")
+sys.exit(0 if large_mb - small_mb < 8 else 1)
+PYTHON
+echo "Testing adversarial documents"
+for file in test/adversarial/*.yml; do
+    echo "Testing $file"
+    # Each document must be rejected by the loader limits within the time and memory ceilings
+    (ulimit -v 1000000; timeout 10 python3 check.py --limits --max-nodes 10000 --max-scalar-length 10000 "$file")
+    status=$?
+    if [ "$status" -ne 1 ]; then
+        echo "Expected $file to be rejected, got exit status $status"
+        exit 1
+    fi
+done
+echo "Testing SARIF rules"
+# Each result refers to the rule of its error code, also when read from the cache
+cache_file=$(mktemp)
+for run in 1 2; do
+    python3 check.py --format sarif --suggest --cache "$cache_file" test/positions.yml | python3 -c "
+import json, sys
+run = json.load(sys.stdin)['runs'][0]
+rules = run['tool']['driver']['rules']
+rule_ids = [result['ruleId'] for result in run['results']]
+assert all(rules[result['ruleIndex']]['id'] == result['ruleId'] for result in run['results']), rule_ids
+assert 'type.invalid' in rule_ids and 'gpu.invalid' in rule_ids, rule_ids
+" || exit 1
+done
+rm -f "$cache_file"
+echo "Testing the module memo on aliased data"
+# Hashing modules for --cache must not expand aliases
+cache_file=$(mktemp)
+(ulimit -v 1000000; timeout 10 python3 check.py --cache "$cache_file" test/adversarial/module_alias_bomb.yml) || exit 1
+rm -f "$cache_file"
+# Modules with the same content share a memo entry, their errors name the module they are reported for
+python3 - <<'PYTHON' || exit 1
+import check
+
+memo = check.SubtreeMemo()
+module = {'image': 'bad', 'working_directory': 'relative', 'input_files': ['COPY a b']}
+memo.validate_task(name='first', task_data=module, yaml_version=2)
+errors = memo.validate_task(name='second', task_data=dict(module), yaml_version=2)
+expected = check.validate_task(name='second', task_data=module, yaml_version=2)
+assert len(memo._entries) == 1, memo._entries
+assert check.ValidationResult.render_errors(errors) == check.ValidationResult.render_errors(expected), errors
+assert [record.path for record in errors['second']['input_files']] == [('modules', 'second', 'input_files', 0)]
+PYTHON
+echo "Testing result cache eviction"
+# Short runs must keep the cache within --cache-max-entries as well
+cache_file=$(mktemp)
+python3 check.py --cache "$cache_file" --cache-max-entries 1 test/*.yml > /dev/null
+python3 -c "
+import sqlite3, sys
+connection = sqlite3.connect(sys.argv[1])
+sys.exit(any(connection.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0] > 1 for table in ('results', 'subtree_errors')))
+" "$cache_file" || exit 1
+rm -f "$cache_file"
+echo "Testing the validation server socket"
+# A regular file at the socket path must be kept, the socket must be removed on SIGTERM
+socket_dir=$(mktemp -d)
+touch "$socket_dir/file"
+python3 check.py --serve "$socket_dir/file" 2> /dev/null && exit 1
+[ -f "$socket_dir/file" ] || exit 1
+python3 check.py --serve "$socket_dir/socket" 2> /dev/null &
+server_pid=$!
+for _ in $(seq 50); do [ -S "$socket_dir/socket" ] && break; sleep 0.1; done
+python3 check_client.py --socket "$socket_dir/socket" test/works.yml > /dev/null || exit 1
+kill -TERM $server_pid
+wait $server_pid || exit 1
+[ -e "$socket_dir/socket" ] && exit 1
+rm -r "$socket_dir"
+echo "Testing malformed HTTP requests"
+# Each must be answered with 400 and a closed connection, and counted in /metrics
+python3 - <<'PYTHON' || exit 1
+import json
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+with socket.socket() as probe:
+    probe.bind(('127.0.0.1', 0))
+    port = probe.getsockname()[1]
+server = subprocess.Popen([sys.executable, 'check.py', '--http', f'127.0.0.1:{port}', '--jobs', '1'], stderr=subprocess.DEVNULL)
+try:
+    requests = [
+        b'GET /health\r\n\r\n',
+        b'POST /validate HTTP/1.1\r\nContent-Length: ten\r\n\r\n',
+        b'POST /validate HTTP/1.1\r\nContent-Length: -5\r\n\r\n',
+    ]
+    for request in requests:
+        for _ in range(100):
+            try:
+                connection = socket.create_connection(('127.0.0.1', port))
+                break
+            except ConnectionRefusedError:
+                time.sleep(0.1)
+        with connection:
+            connection.sendall(request)
+            response = b''
+            while chunk := connection.recv(65536):
+                response += chunk
+        head = response.split(b'\r\n\r\n')[0].decode('latin-1')
+        assert head.startswith('HTTP/1.1 400 ') and 'Connection: close' in head, (request, response)
+    with urllib.request.urlopen(f'http://127.0.0.1:{port}/metrics') as metrics_response:
+        metrics = json.load(metrics_response)
+    assert metrics['requests'].get('400') == len(requests), metrics
+finally:
+    server.terminate()
+    server.wait()
+PYTHON
+echo "Testing archive and document stream inputs"
+# Both must find and validate two copies of the valid config
+python3 - <<'PYTHON' | python3 check.py --archive - | grep -q "Checked 2 files: 2 valid" || exit 1
+import io
+import sys
+import tarfile
+
+with open('test/works.yml', 'rb') as f:
+    content = f.read()
+with tarfile.open(fileobj=sys.stdout.buffer, mode='w|gz') as tar_file:
+    for name in ('app/.biolib/config.yml', 'other/.biolib/config.yml'):
+        info = tarfile.TarInfo(name)
+        info.size = len(content)
+        tar_file.addfile(info, io.BytesIO(content))
+PYTHON
+{ cat test/works.yml; echo '---'; cat test/works.yml; } | python3 check.py --stdin-documents | grep -q "Checked 2 files: 2 valid" || exit 1
+echo "Testing cold start budget"
+python3 - <<'PYTHON'
+import os
+import subprocess
+import sys
+import time
+
+budget_ms = float(os.environ.get('COLD_START_BUDGET_MS', '250'))
+durations = []
+for _ in range(5):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, 'check.py', 'test/works.yml'], stdout=subprocess.DEVNULL, check=True)
+    durations.append((time.perf_counter() - start) * 1000)
+
+best_ms = min(durations)
+print(f"Cold start: {best_ms:.1f} ms (budget {budget_ms:.0f} ms)")
+sys.exit(0 if best_ms <= budget_ms else 1)
+PYTHON